@@ -0,0 +1,85 @@
+import json
+import spacy
+
+# Une seule annotation spaCy par document : tokens, lemmes, lemmes filtrés
+# et entités nommées sont extraits du même Doc (plus de data_lemmatized.json
+# intermédiaire ni de second passage sur le texte reconstruit).
+
+def load_lang_model(lang_code):
+    """
+    Renvoie le modèle spaCy adapté à la langue.
+    Par ex. : fr -> fr_core_news_md, en -> en_core_web_md, ...
+    """
+    if lang_code == "fr":
+        return spacy.load("fr_core_news_md")
+    elif lang_code == "en":
+        return spacy.load("en_core_web_md")
+    # Ajouter d’autres langues si besoin ...
+    else:
+        raise ValueError(f"Langue non gérée : {lang_code}")
+
+def keep_token(token):
+    # Filtrage : ni mot vide, ni ponctuation, ni espace, ni nom propre
+    return (not token.is_stop
+            and not token.is_punct
+            and not token.is_space
+            and token.pos_ != "PROPN")
+
+def analyze_doc(doc):
+    """
+    Tout ce qu'il faut d'un Doc spaCy en un seul parcours.
+    """
+    tokens_and_lemmas = []
+    filtered_lemmas = []
+    for token in doc:
+        tokens_and_lemmas.append((token.text, token.lemma_))
+        if keep_token(token):
+            # On garde le lemma en minuscules
+            filtered_lemmas.append(token.lemma_.lower())
+
+    named_entities = [(ent.text, ent.label_) for ent in doc.ents]
+    return tokens_and_lemmas, filtered_lemmas, named_entities
+
+def save_json(data, output_file):
+    with open(output_file, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+
+def main(save_tokens=True, batch_size=32):
+    """
+    save_tokens : écrit aussi les couples (token, lemme) dans data_tokens_lemmas.json,
+    comme l'ancienne étape de tokenisation ; False pour s'en passer (moins de mémoire).
+    """
+    input_file = "../outputs/data_loaded.json"
+    output_file = "../outputs/data_after_ner.json"
+    ner_output_file = "../outputs/named_entities.json"
+    tokens_output_file = "../outputs/data_tokens_lemmas.json"
+
+    with open(input_file, "r", encoding="utf-8") as f:
+        all_data = json.load(f)
+
+    tokens_data = {}
+    cleaned_data = {}
+    entities_info = {}
+
+    for lang_code, texts_dict in all_data.items():
+        nlp = load_lang_model(lang_code)  # un seul chargement par langue
+        tokens_data[lang_code] = {}
+        cleaned_data[lang_code] = {}
+        entities_info[lang_code] = {}
+
+        docs = nlp.pipe(texts_dict.values(), batch_size=batch_size)
+        for file_name, doc in zip(texts_dict, docs):
+            tokens_and_lemmas, filtered_lemmas, named_entities = analyze_doc(doc)
+            if save_tokens:
+                tokens_data[lang_code][file_name] = tokens_and_lemmas
+            cleaned_data[lang_code][file_name] = filtered_lemmas
+            entities_info[lang_code][file_name] = named_entities
+
+    # Sauvegarde
+    save_json(cleaned_data, output_file)
+    save_json(entities_info, ner_output_file)
+    if save_tokens:
+        save_json(tokens_data, tokens_output_file)
+
+if __name__ == "__main__":
+    main()
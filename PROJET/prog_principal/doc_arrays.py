@@ -0,0 +1,65 @@
+import numpy as np
+from spacy.attrs import ORTH, LOWER, LEMMA, POS, ENT_IOB, ENT_TYPE
+from spacy.attrs import IS_PUNCT, IS_SPACE, IS_QUOTE, IS_CURRENCY, IS_STOP
+from spacy.symbols import PROPN
+
+# Extraction vectorisée des attributs d'un Doc spaCy : Doc.to_array renvoie
+# une colonne uint64 par attribut (booléens, identifiants POS, hash des chaînes),
+# les filtres et comptages se font ensuite avec NumPy au lieu d'une boucle Python.
+ATTRS = {
+    "orth": ORTH, "lower": LOWER, "lemma": LEMMA, "pos": POS,
+    "ent_iob": ENT_IOB, "ent_type": ENT_TYPE,
+    "is_punct": IS_PUNCT, "is_space": IS_SPACE, "is_quote": IS_QUOTE,
+    "is_currency": IS_CURRENCY, "is_stop": IS_STOP,
+}
+# Valeurs de ENT_IOB (token.ent_iob) -> token.ent_iob_
+IOB_STRINGS = np.array(["", "I", "O", "B"])
+
+def doc_columns(doc, names):
+    """
+    {nom: colonne} pour les attributs demandés (voir ATTRS).
+    Les attributs booléens sont convertis en tableaux bool.
+    """
+    array = doc.to_array([ATTRS[name] for name in names]).reshape(len(doc), len(names))
+    columns = {}
+    for j, name in enumerate(names):
+        column = array[:, j]
+        columns[name] = column.astype(bool) if name.startswith("is_") else column
+    return columns
+
+def hashes_to_strings(doc, hashes):
+    """
+    Chaînes correspondant à un tableau de hash (ou d'identifiants POS) :
+    chaque valeur distincte n'est cherchée qu'une fois dans doc.vocab.strings.
+    """
+    if len(hashes) == 0:
+        return []
+    unique, inverse = np.unique(hashes, return_inverse=True)
+    strings = [doc.vocab.strings[int(h)] for h in unique]
+    return [strings[i] for i in inverse.tolist()]
+
+def lemma_pos_strings(doc, lemma_hashes, pos_ids):
+    """
+    Chaînes "lemme_POS" (lemme en minuscules), construites une seule fois
+    par couple (lemme, POS) distinct.
+    """
+    if len(lemma_hashes) == 0:
+        return []
+    lemma_unique, lemma_idx = np.unique(lemma_hashes, return_inverse=True)
+    pos_unique, pos_idx = np.unique(pos_ids, return_inverse=True)
+    pairs, inverse = np.unique(lemma_idx * len(pos_unique) + pos_idx, return_inverse=True)
+
+    lemmas = [doc.vocab.strings[int(h)].lower() for h in lemma_unique]
+    tags = [doc.vocab.strings[int(p)] for p in pos_unique]
+    strings = [f"{lemmas[pair // len(tags)]}_{tags[pair % len(tags)]}" for pair in pairs.tolist()]
+    return [strings[i] for i in inverse.tolist()]
+
+def valid_token_mask(columns):
+    """
+    Équivalent vectorisé de is_valid_token : ni ponctuation, ni espace,
+    ni guillemet, ni symbole monétaire.
+    """
+    return ~(columns["is_punct"] | columns["is_space"] | columns["is_quote"] | columns["is_currency"])
+
+def is_propn(pos_column):
+    return pos_column == PROPN
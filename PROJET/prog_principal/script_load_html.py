@@ -2,18 +2,25 @@
 # -*- coding: utf-8 -*-
 
 import os
+import sys
 import json
 from bs4 import BeautifulSoup
 import glob
+# corpus_manifest est partagé : une seule copie, dans prog/prog
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "prog", "prog"))
+from corpus_manifest import CorpusManifest
 
-def load_html_from_language_folder(lang_folder):
+def load_html_from_language_folder(lang_folder, html_files=None):
     """
     Parcourt récursivement un dossier de langue et extrait le texte de chaque fichier HTML.
+    html_files : liste des fichiers déjà connue (ex : CorpusManifest.paths(lang=...)),
+    sinon le dossier est parcouru avec glob.
     Retourne un dictionnaire {rel_path: texte}.
     """
     data = {}
-    pattern = os.path.join(lang_folder, "**", "*.html")
-    html_files = glob.glob(pattern, recursive=True)
+    if html_files is None:
+        pattern = os.path.join(lang_folder, "**", "*.html")
+        html_files = glob.glob(pattern, recursive=True)
 
     for full_path in html_files:
         rel_path = os.path.relpath(full_path, lang_folder)
@@ -34,12 +41,12 @@ def main():
     base_dir = "../data/corpus-multi"  # Modifier si besoin
     output_file = "../outputs/data_loaded.json"
     all_data = {}
+    manifest = CorpusManifest.load_or_build(base_dir, "../outputs/corpus_manifest.json")
 
-    for lang in os.listdir(base_dir):
+    for lang in manifest.langs:
         lang_path = os.path.join(base_dir, lang)
-        if os.path.isdir(lang_path):
-            print(f"[INFO] Traitement langue : {lang}")
-            all_data[lang] = load_html_from_language_folder(lang_path)
+        print(f"[INFO] Traitement langue : {lang}")
+        all_data[lang] = load_html_from_language_folder(lang_path, manifest.paths(lang=lang))
 
     with open(output_file, "w", encoding="utf-8") as f_out:
         json.dump(all_data, f_out, ensure_ascii=False, indent=2)
@@ -17,6 +17,7 @@ import os
 import sys
 import json
 import spacy
+from doc_arrays import doc_columns, hashes_to_strings, is_propn
 
 LANG_TO_MODEL = {
     "fr": "fr_core_news_sm",
@@ -31,7 +32,23 @@ def load_data(json_path):
         return json.load(f)
 
 def preprocess_text(text, nlp):
-    doc = nlp(text)
+    return preprocess_doc(nlp(text))
+
+def preprocess_doc(doc):
+    """
+    Filtrage vectorisé (Doc.to_array) : mêmes résultats que preprocess_doc_tokens.
+    """
+    columns = doc_columns(doc, ["is_space", "is_punct", "is_stop", "pos", "lemma"])
+    total_tokens = int((~columns["is_space"]).sum())
+    if total_tokens == 0:
+        return [], 0.0
+    nb_ent_tokens = sum(len(ent) for ent in doc.ents)
+    proportion_ne = nb_ent_tokens / total_tokens
+    kept = ~(columns["is_space"] | columns["is_punct"] | columns["is_stop"] | is_propn(columns["pos"]))
+    tokens = [lemma.lower() for lemma in hashes_to_strings(doc, columns["lemma"][kept])]
+    return tokens, proportion_ne
+
+def preprocess_doc_tokens(doc):
     total_tokens = sum(not t.is_space for t in doc)
     if total_tokens == 0:
         return [], 0.0
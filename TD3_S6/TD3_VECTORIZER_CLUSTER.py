@@ -11,7 +11,7 @@ import numpy as np
 from sklearn.cluster import AffinityPropagation
 from sklearn.metrics import DistanceMetric 
 from sklearn.feature_extraction.text import CountVectorizer
-import sklearn
+from sklearn.preprocessing import normalize
 import json
 import glob
 import re
@@ -70,7 +70,6 @@ for subcorpus in glob.glob(path_copora):
         Liste_00 = list(Set_00)
         dic_output = {}
         liste_words=[]
-        matrice=[]
         
         for l in Liste_00:
                 
@@ -80,19 +79,13 @@ for subcorpus in glob.glob(path_copora):
 
         try:
             words = np.asarray(liste_words)
-            for w in words:
-                liste_vecteur=[]
-            
-                    
-                for w2 in words:
-                
-                        V = CountVectorizer(ngram_range=(2,3), analyzer='char')
-                        X = V.fit_transform([w,w2]).toarray()
-                        distance_tab1=sklearn.metrics.pairwise.cosine_distances(X)            
-                        liste_vecteur.append(distance_tab1[0][1])
-                    
-                matrice.append(liste_vecteur)
-            matrice_def=-1*np.array(matrice)
+            # Une seule vectorisation de tous les mots, puis produit de la matrice
+            # creuse normalisée : mêmes distances cosinus que le CountVectorizer par paire
+            V = CountVectorizer(ngram_range=(2,3), analyzer='char')
+            X = normalize(V.fit_transform(words))
+            matrice = np.clip(1.0 - (X @ X.T).toarray(), 0, 2)
+            np.fill_diagonal(matrice, 0.0)
+            matrice_def=-1*matrice
            
                   
             affprop = AffinityPropagation(affinity="precomputed", damping= 0.6, random_state = None) 
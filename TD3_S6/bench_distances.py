@@ -0,0 +1,63 @@
+import glob
+import time
+import random
+import numpy as np
+import sklearn
+from sklearn.feature_extraction.text import CountVectorizer
+from main import normalize_tokens, cosine_distance_matrix
+
+SIZES = [500, 2000, 5000]
+LOOP_MAX_N = 150  # au-delà, la durée de l'ancienne boucle est extrapolée (coût en N²)
+DATA_GLOB = "DATA/*/*"
+
+def pairwise_loop_distances(words, ngram_range=(2,3)):
+    """
+    Ancienne méthode : un CountVectorizer ajusté pour chaque couple de mots.
+    """
+    matrice = []
+    for w in words:
+        vect_row = []
+        for w2 in words:
+            V = CountVectorizer(ngram_range=ngram_range, analyzer='char')
+            X = V.fit_transform([w, w2]).toarray()
+            vect_row.append(sklearn.metrics.pairwise.cosine_distances(X)[0][1])
+        matrice.append(vect_row)
+    return np.array(matrice)
+
+def load_words():
+    """
+    Mots uniques (tokens de la première colonne) des fichiers .bio de DATA.
+    """
+    tokens = []
+    for directory in glob.glob(DATA_GLOB):
+        for path in glob.glob(directory + "/*.bio"):
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    parts = line.split()
+                    if len(parts) >= 2:
+                        tokens.append(parts[0])
+    return sorted({t for t in normalize_tokens(tokens) if len(t) > 1})
+
+def main():
+    words = load_words()
+    print(f"[INFO] {len(words)} mots uniques disponibles")
+    random.seed(0)
+
+    for n in SIZES:
+        sample = random.sample(words, min(n, len(words)))
+
+        start = time.perf_counter()
+        distances = cosine_distance_matrix(sample)
+        t_new = time.perf_counter() - start
+
+        n_loop = min(len(sample), LOOP_MAX_N)
+        start = time.perf_counter()
+        reference = pairwise_loop_distances(sample[:n_loop])
+        t_loop = (time.perf_counter() - start) * (len(sample) / n_loop) ** 2
+
+        ecart = np.abs(distances[:n_loop, :n_loop] - reference).max()
+        print(f"  N={len(sample):>5} → produit creux {t_new:7.3f} s | boucle par paire ≈ {t_loop:9.1f} s "
+              f"(x{t_loop / t_new:,.0f}) | écart max {ecart:.1e}")
+
+if __name__ == "__main__":
+    main()
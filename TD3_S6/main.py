@@ -69,9 +69,24 @@ def get_unique_tokens(token_counter):
     return list(token_counter.keys())
 
 import numpy as np
-import sklearn
 from sklearn.cluster import AffinityPropagation
 from sklearn.feature_extraction.text import CountVectorizer
+from sklearn.preprocessing import normalize
+
+def cosine_distance_matrix(words, ngram_range=(2,3)):
+    """
+    Matrice des distances cosinus entre tous les mots (n-grammes de caractères).
+    Une seule vectorisation de tous les mots, puis un produit de la matrice creuse
+    normalisée par sa transposée : mêmes distances qu'un CountVectorizer ajusté
+    sur chaque paire (les n-grammes absents des deux mots ne changent ni le
+    produit scalaire ni les normes).
+    """
+    V = CountVectorizer(ngram_range=ngram_range, analyzer='char')
+    X = normalize(V.fit_transform(words))
+    distances = 1.0 - (X @ X.T).toarray()
+    np.clip(distances, 0, 2, out=distances)
+    np.fill_diagonal(distances, 0.0)
+    return distances
 
 def cluster_tokens_with_affprop(tokens, token_counter, ngram_range=(2,3)):
     """
@@ -86,22 +101,8 @@ def cluster_tokens_with_affprop(tokens, token_counter, ngram_range=(2,3)):
     """
     # Préparation de la matrice de distance
     words = np.asarray(tokens)
-    size = len(words)
-    # Construction de la matrice de similarités
-    # (attention: on va construire la matrice "distance", puis on la rend négative
-    # pour l'utiliser avec AffinityPropagation)
-    matrice = []
-
-    for w in words:
-        vect_row = []
-        for w2 in words:
-            V = CountVectorizer(ngram_range=ngram_range, analyzer='char')
-            X = V.fit_transform([w, w2]).toarray()
-            dist_cos = sklearn.metrics.pairwise.cosine_distances(X)[0][1]
-            vect_row.append(dist_cos)
-        matrice.append(vect_row)
-
-    matrice_np = np.array(matrice)
+    matrice_np = cosine_distance_matrix(list(words), ngram_range)
+
     # Pour l'AffinityPropagation, il faut fournir une matrice de similarités
     # => On prend l'opposé de la distance (distance * -1)
     matrice_def = -1 * matrice_np
@@ -3,7 +3,7 @@ import numpy as np
 from sklearn.cluster import AffinityPropagation
 from sklearn.metrics import DistanceMetric
 from sklearn.feature_extraction.text import CountVectorizer
-import sklearn
+from sklearn.preprocessing import normalize
 import json
 import glob
 import re
@@ -50,19 +50,14 @@ for subcorpus in glob.glob(path_copora):
 
         try:
             words = np.asarray(liste_words)  # met en numpy
-            matrice = []  # init matrice de distance
-
-            # boucle pour calculer les distances cosinus
-            for w in words:
-                liste_vecteur = []
-                for w2 in words:
-                    V = CountVectorizer(ngram_range=(2,3), analyzer='char')  # vectorisation
-                    X = V.fit_transform([w, w2]).toarray()
-                    distance = sklearn.metrics.pairwise.cosine_distances(X)[0][1]  # distance cosinus
-                    liste_vecteur.append(distance)
-                matrice.append(liste_vecteur)
-
-            matrice_def = -1 * np.array(matrice)  # transformation pour clustering
+
+            # distances cosinus : une seule vectorisation, puis produit de la matrice normalisée
+            V = CountVectorizer(ngram_range=(2,3), analyzer='char')  # vectorisation
+            X = normalize(V.fit_transform(words))  # lignes de norme 1
+            matrice = np.clip(1.0 - (X @ X.T).toarray(), 0, 2)  # distance = 1 - cosinus
+            np.fill_diagonal(matrice, 0.0)
+
+            matrice_def = -1 * matrice  # transformation pour clustering
 
             # clustering
             affprop = AffinityPropagation(affinity="precomputed", damping=0.6, random_state=None)
@@ -0,0 +1,79 @@
+import os
+import json
+from collections import OrderedDict
+
+class LemmaCache:
+    """
+    Cache des lemmes par type : (langue, use_pos, token) -> lemme.
+    - taille bornée (max_entries), éviction du moins récemment utilisé
+    - sauvegarde / rechargement JSON optionnels (cache_path)
+    - statistiques : hits (occurrences servies par le cache), misses (types lemmatisés)
+    """
+
+    def __init__(self, cache_path=None, max_entries=200000):
+        self.cache_path = cache_path
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+        if cache_path and os.path.exists(cache_path):
+            with open(cache_path, "r", encoding="utf-8") as f:
+                for lang, use_pos, token, lemma in json.load(f):
+                    self.entries[(lang, use_pos, token)] = lemma
+            print(f"[CACHE] {len(self.entries)} lemmes rechargés depuis {cache_path}")
+
+    def get(self, key):
+        lemma = self.entries.get(key)
+        if lemma is not None:
+            self.entries.move_to_end(key)
+        return lemma
+
+    def put(self, key, lemma):
+        self.entries[key] = lemma
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def save(self):
+        if not self.cache_path:
+            return
+        with open(self.cache_path, "w", encoding="utf-8") as f:
+            json.dump([[*key, lemma] for key, lemma in self.entries.items()], f, ensure_ascii=False)
+
+    def print_stats(self):
+        total = self.hits + self.misses
+        rate = self.hits / total if total else 0.0
+        print(f"[CACHE] Lemmes : {self.hits} hits / {self.misses} misses ({rate:.1%}), "
+              f"{len(self.entries)} types en cache")
+
+
+def lemmatize_with_cache(nlp, tokens, cache, lang, use_pos=False):
+    """
+    Lemmatise chaque type distinct une seule fois (nlp.pipe sur les types
+    absents du cache), puis reporte les résultats sur toutes les occurrences.
+    """
+    resolved = {}
+    missing = []
+    for token in dict.fromkeys(tokens):
+        lemma = cache.get((lang, use_pos, token))
+        if lemma is None:
+            missing.append(token)
+        else:
+            resolved[token] = lemma
+
+    for token, doc in zip(missing, nlp.pipe(missing)):
+        if len(doc) == 0:
+            lemma = ""
+        else:
+            token_spacy = doc[0]  # un seul token dans ce doc
+            lemma = token_spacy.lemma_.lower()
+            if use_pos:
+                lemma = f"{lemma}_{token_spacy.pos_}"
+
+        resolved[token] = lemma
+        cache.put((lang, use_pos, token), lemma)
+
+    cache.misses += len(missing)
+    cache.hits += len(tokens) - len(missing)
+    return [resolved[token] for token in tokens]
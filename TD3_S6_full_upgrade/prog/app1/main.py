@@ -6,6 +6,7 @@ from tqdm import tqdm  # Pour la barre de progression
 # Imports depuis nos modules
 from reader import parse_iob_file
 from spacy_processor import lemmatize_tokens
+from lemma_cache import LemmaCache
 from vectorizer import vectorize_tokens, compute_similarity
 from clusterer import run_affinity_propagation, build_clusters_dict
 from saver import save_result_for_file
@@ -24,6 +25,10 @@ NER_PREFIXES = ["B-LOC", "I-LOC"]
 # Utiliser le lemme + POS ?
 USE_POS = True
 
+# Cache des lemmes conservé d'une exécution à l'autre
+LEMMA_CACHE_PATH = os.path.join(RESULTS_DIR, "lemma_cache.json")
+LEMMA_CACHE_MAX = 200000
+
 # Programme Principal
 
 def main():
@@ -34,6 +39,8 @@ def main():
         print("Aucun fichier .bio trouvé dans data Fin.")
         return
 
+    lemma_cache = LemmaCache(LEMMA_CACHE_PATH, max_entries=LEMMA_CACHE_MAX)
+
     # On utilise tqdm pour la progression
     for filepath in tqdm(filepaths, desc="Traitement des fichiers"):
         # Optionnel, si vous voulez un log plus verbeux
@@ -56,7 +63,7 @@ def main():
             continue
 
         # 3) Lemmatisation (et POS si USE_POS=True)
-        tokens_lemma = lemmatize_tokens(tokens_raw, use_pos=USE_POS)
+        tokens_lemma = lemmatize_tokens(tokens_raw, use_pos=USE_POS, cache=lemma_cache)
 
         # 4) Vectorisation (n-grammes de caractères)
         X, vect = vectorize_tokens(tokens_lemma, analyzer='char', ngram_range=(2,3))
@@ -87,6 +94,8 @@ def main():
             used_tokens=tokens_lemma
         )
 
+    lemma_cache.save()
+    lemma_cache.print_stats()
     print("\nTous les fichiers ont été traités.")
 
 
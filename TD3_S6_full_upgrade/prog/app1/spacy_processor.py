@@ -1,32 +1,23 @@
 import spacy
+from lemma_cache import LemmaCache, lemmatize_with_cache
 
 # Assurez-vous d'avoir installé le modèle spaCy adéquat, par ex.:
 #   python -m spacy download fr_core_news_sm
 nlp = spacy.load("fr_core_news_lg")
+lemma_cache = LemmaCache()
 
-def lemmatize_tokens(tokens, use_pos=False):
+def lemmatize_tokens(tokens, use_pos=False, cache=None):
     """
     Prend une liste de tokens (strings).
     Les passe à spaCy pour récupérer leur lemme (et la POS si use_pos=True).
     Retourne une liste de chaînes transformées.
     Ex si use_pos=False : ["maison", "école", ...]
     Ex si use_pos=True :  ["maison_NOUN", "école_NOUN", ...]
+    cache : LemmaCache (None = cache mémoire partagé du module).
     """
-    results = []
+    if cache is None:
+        cache = lemma_cache
 
-    # Pour optimiser, on crée un doc par token via nlp.pipe (plus rapide que nlp(token) en boucle)
-    for doc in nlp.pipe(tokens):
-        if len(doc) == 0:
-            results.append("")
-            continue
-
-        token_spacy = doc[0]  # un seul token dans ce doc
-        lemma = token_spacy.lemma_.lower()
-
-        if use_pos:
-            pos = token_spacy.pos_
-            results.append(f"{lemma}_{pos}")
-        else:
-            results.append(lemma)
-
-    return results
+    # Chaque type distinct n'est passé qu'une fois à nlp.pipe (un doc par token),
+    # les occurrences répétées sont servies par le cache
+    return lemmatize_with_cache(nlp, tokens, cache, nlp.lang, use_pos)
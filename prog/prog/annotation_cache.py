@@ -0,0 +1,64 @@
+import os
+import json
+import hashlib
+
+def text_hash(text):
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+class AnnotationCache:
+    """
+    Cache disque des résultats d'analyze_doc, indexé par (modèle, version, hash du texte).
+    Un fichier JSONL par modèle/version/profil/taille de découpe, en ajout seul :
+    changer de modèle (ou de version, ou de max_chunk_chars) revient à repartir
+    d'un cache vide, les annotations d'un texte découpé pouvant différer. Seuls les offsets des
+    lignes sont gardés en mémoire ; les enregistrements sont relus à la demande.
+    """
+
+    def __init__(self, cache_dir, nlp, profile, max_chunk_chars=None):
+        os.makedirs(cache_dir, exist_ok=True)
+        model_id = f"{nlp.meta['lang']}_{nlp.meta['name']}-{nlp.meta['version']}"
+        chunk_id = "" if max_chunk_chars is None else f"_chunk{max_chunk_chars}"
+        self.cache_path = os.path.join(cache_dir, f"annotations_{model_id}_{profile}{chunk_id}.jsonl")
+        self.offsets = {}
+        self.hits = 0
+        self.misses = 0
+
+        self.file = open(self.cache_path, "a+b")
+        self.file.seek(0)
+        offset = 0
+        for line in self.file:
+            if not line.endswith(b"\n"):
+                break
+            self.offsets[json.loads(line)["hash"]] = offset
+            offset += len(line)
+
+        # Une ligne tronquée (exécution interrompue) est ignorée et écrasée
+        self.file.truncate(offset)
+
+    def get(self, key):
+        """
+        Résultat d'analyze_doc pour ce hash de texte, ou None.
+        """
+        offset = self.offsets.get(key)
+        if offset is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self.file.seek(offset)
+        return json.loads(self.file.readline())["stats"]
+
+    def put(self, key, stats):
+        self.file.seek(0, os.SEEK_END)
+        self.offsets[key] = self.file.tell()
+        line = json.dumps({"hash": key, "stats": stats}, ensure_ascii=False) + "\n"
+        self.file.write(line.encode("utf-8"))
+
+    def close(self):
+        self.file.close()
+
+    def print_stats(self):
+        total = self.hits + self.misses
+        rate = self.hits / total if total else 0.0
+        print(f"[CACHE] Annotations : {self.hits} hits / {self.misses} misses ({rate:.1%}) "
+              f"→ {self.cache_path}")
@@ -0,0 +1,48 @@
+import time
+from spacy.tokens import Doc
+from html_loader import iter_corpus_documents
+from spacy_processor_multilang import get_nlp, analyze_partial, analyze_partial_tokens
+
+BASE_DIR = "../corpus_multi"
+N_TEXTS = 200
+DOC_SIZES = [50, 500, 5000, 50000]  # en tokens spaCy
+TOKENS_PER_SIZE = 200000  # tokens traités par mesure
+
+def build_docs(nlp, n_texts):
+    """
+    Annote quelques textes du corpus et les recolle en un seul Doc,
+    découpé ensuite aux tailles voulues.
+    """
+    texts = []
+    for _, _, text in iter_corpus_documents(BASE_DIR):
+        texts.append(text)
+        if len(texts) == n_texts:
+            break
+    return Doc.from_docs(list(nlp.pipe(texts, batch_size=32)))
+
+def time_extraction(fn, docs):
+    start = time.perf_counter()
+    for doc in docs:
+        fn(doc)
+    return time.perf_counter() - start
+
+def main():
+    nlp = get_nlp()
+    corpus_doc = build_docs(nlp, N_TEXTS)
+    print(f"[INFO] {len(corpus_doc)} tokens annotés")
+
+    for size in DOC_SIZES:
+        if size > len(corpus_doc):
+            break
+        doc = corpus_doc[:size].as_doc()
+        if analyze_partial(doc) != analyze_partial_tokens(doc):
+            raise AssertionError(f"Résultats différents pour {size} tokens")
+
+        docs = [doc] * max(1, TOKENS_PER_SIZE // size)
+        loop = time_extraction(analyze_partial_tokens, docs)
+        vectorized = time_extraction(analyze_partial, docs)
+        print(f"  {size:>6} tokens/doc → boucle {loop / len(docs) * 1000:8.3f} ms | "
+              f"to_array {vectorized / len(docs) * 1000:8.3f} ms | x{loop / vectorized:.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+import os
+import sys
+import glob
+import time
+import resource
+from multiprocessing import Process, Queue
+from html_backends import BACKENDS, html_to_text, resolve_backend
+
+def peak_rss_mb():
+    # ru_maxrss est en Ko sous Linux, en octets sous macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+def bench_backend(backend, filepaths, queue):
+    """
+    Extrait tous les fichiers avec un backend (dans un processus dédié,
+    pour que le pic de mémoire mesuré soit propre au backend).
+    """
+    start = time.perf_counter()
+    n_chars = 0
+    for path in filepaths:
+        with open(path, "r", encoding="utf-8") as f:
+            n_chars += len(html_to_text(f.read(), backend))
+    elapsed = time.perf_counter() - start
+    queue.put((backend, len(filepaths) / elapsed, peak_rss_mb(), n_chars))
+
+def main(base_dir, limit=None):
+    filepaths = sorted(glob.glob(os.path.join(base_dir, "**", "*.html"), recursive=True))
+    if limit:
+        filepaths = filepaths[:limit]
+    print(f"[INFO] {len(filepaths)} fichiers HTML dans {base_dir}")
+
+    queue = Queue()
+    for backend in BACKENDS:
+        if resolve_backend(backend) != backend:
+            continue
+        p = Process(target=bench_backend, args=(backend, filepaths, queue))
+        p.start()
+        name, docs_per_sec, rss, n_chars = queue.get()
+        p.join()
+        print(f"  {name:<12} → {docs_per_sec:8.1f} docs/s | pic RSS {rss:7.1f} Mo | {n_chars} caractères")
+
+if __name__ == "__main__":
+    BASE_DIR = "../corpus_multi"
+    LIMIT = None  # ex : 2000 pour un test rapide
+
+    main(BASE_DIR, LIMIT)
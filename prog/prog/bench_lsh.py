@@ -0,0 +1,20 @@
+from cluster_multilang import collect_lemmes_by_lang, vectorize_tokens
+from minhash_similarity import lsh_recall_report
+
+INPUT_PATH = "../pipeline_results/processed_multilang.json"  # ou .jsonl / .lemmes.npz
+NGRAM_RANGES = [(2, 3), (4, 5)]
+CONFIGS = [(64, 8), (64, 16), (64, 32), (128, 32), (128, 64)]  # (num_perm, bands)
+THRESHOLDS = (0.3, 0.5, 0.7, 0.9)
+
+def main():
+    for lang, lemmes in collect_lemmes_by_lang(INPUT_PATH).items():
+        tokens = sorted(t for t in lemmes if len(t) >= 3)
+        if len(tokens) < 5:
+            continue
+        for ngram_range in NGRAM_RANGES:
+            print(f"[INFO] {lang} : {len(tokens)} lemmes, n-grammes {ngram_range}")
+            X, _ = vectorize_tokens(tokens, ngram_range=ngram_range)
+            lsh_recall_report(X, CONFIGS, THRESHOLDS)
+
+if __name__ == "__main__":
+    main()
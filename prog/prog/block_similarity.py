@@ -0,0 +1,77 @@
+import tracemalloc
+import numpy as np
+from numpy.lib.format import open_memmap
+from scipy import sparse
+from sklearn.preprocessing import normalize
+
+# Similarité cosinus dense calculée par blocs de lignes, en float32 :
+# seul le résultat (N x N, ou triangle supérieur condensé) et un bloc
+# temporaire dont la taille respecte memory_mb sont alloués.
+DEFAULT_MEMORY_MB = 256
+
+def block_rows_for_budget(n_rows, memory_mb=DEFAULT_MEMORY_MB):
+    """
+    Nombre de lignes par bloc pour qu'un bloc dense (float32) tienne dans memory_mb.
+    """
+    return max(1, int(memory_mb * 1024 * 1024 // (4 * max(n_rows, 1))))
+
+def condensed_size(n):
+    return n * (n - 1) // 2
+
+def condensed_offset(i, n):
+    """
+    Position dans le tableau condensé de la paire (i, i + 1).
+    """
+    return i * n - i * (i + 1) // 2
+
+def blockwise_similarity(X, memory_mb=DEFAULT_MEMORY_MB, condensed=False, report=True, out_path=None):
+    """
+    Similarité cosinus de toutes les lignes de X.
+    condensed=False : matrice carrée float32 (diagonale à 1).
+    condensed=True : triangle supérieur strict (paires i < j, même ordre que
+    scipy.spatial.distance.squareform), pour les traitements qui s'en contentent.
+    report : affiche la taille des blocs et le pic de mémoire allouée.
+    out_path : écrit le résultat bloc par bloc dans un fichier .npy ouvert par
+    memmap (mode hors mémoire) au lieu d'un tableau en mémoire.
+    """
+    tracing = not tracemalloc.is_tracing()
+    if report and tracing:
+        tracemalloc.start()
+
+    Xn = normalize(sparse.csr_matrix(X, dtype=np.float32))
+    XT = Xn.T.tocsc()
+    n = Xn.shape[0]
+    block_rows = block_rows_for_budget(n, memory_mb)
+
+    shape = (condensed_size(n),) if condensed else (n, n)
+    if out_path is not None:
+        result = open_memmap(out_path, mode="w+", dtype=np.float32, shape=shape)
+    else:
+        result = np.empty(shape, dtype=np.float32)
+
+    for start in range(0, n, block_rows):
+        end = min(start + block_rows, n)
+        block = (Xn[start:end] @ XT).toarray()
+        np.clip(block, 0.0, 1.0, out=block)
+
+        if condensed:
+            for r, i in enumerate(range(start, end)):
+                offset = condensed_offset(i, n)
+                result[offset:offset + n - i - 1] = block[r, i + 1:]
+        else:
+            result[start:end] = block
+            result[np.arange(start, end), np.arange(start, end)] = 1.0
+        del block
+
+    if out_path is not None:
+        result.flush()
+
+    if report:
+        _, peak = tracemalloc.get_traced_memory()
+        if tracing:
+            tracemalloc.stop()
+        print(f"[MEM] Similarité {n} x {n} ({'condensée' if condensed else 'carrée'}, float32) : "
+              f"résultat {result.nbytes / 2**20:.1f} Mo{' (disque)' if out_path else ''}, blocs de {block_rows} lignes, "
+              f"pic alloué {peak / 2**20:.1f} Mo")
+
+    return result
@@ -0,0 +1,130 @@
+import re
+from collections import Counter
+from jsonl_io import index_jsonl_by_lang, iter_jsonl_at
+
+# Les communiqués de presse d'une même langue partagent de longs blocs
+# (en-têtes, pieds de page, mentions de contact). Le texte extrait n'a plus
+# de retours à la ligne fiables : on repère ces blocs par "shingles"
+# (suites de SHINGLE_SIZE mots) présents dans une grande part des documents.
+SHINGLE_SIZE = 8
+MAX_DOC_FRACTION = 0.3
+MIN_DOCS = 10
+WORD = re.compile(r"\S+")
+
+def shingles(words, shingle_size=SHINGLE_SIZE):
+    """
+    Empreintes des suites de shingle_size mots (une par position de départ).
+    """
+    return [hash(tuple(words[i:i + shingle_size])) for i in range(len(words) - shingle_size + 1)]
+
+def count_document_frequency(texts, shingle_size=SHINGLE_SIZE):
+    """
+    Nombre de documents contenant chaque shingle.
+    """
+    df = Counter()
+    n_docs = 0
+    for text in texts:
+        df.update(set(shingles(text.split(), shingle_size)))
+        n_docs += 1
+    return df, n_docs
+
+def frequent_shingles(df, n_docs, max_doc_fraction=MAX_DOC_FRACTION, min_docs=MIN_DOCS):
+    """
+    Shingles présents dans plus de max_doc_fraction des documents.
+    En dessous de min_docs documents, rien n'est considéré comme récurrent.
+    """
+    if n_docs < min_docs:
+        return set()
+    threshold = max_doc_fraction * n_docs
+    return {h for h, count in df.items() if count > threshold}
+
+def strip_text(text, frequent, shingle_size=SHINGLE_SIZE):
+    """
+    Supprime du texte les mots couverts par un shingle récurrent.
+    Seuls ces passages sont retirés (avec l'espace qui les suit) : le reste
+    du texte, retours à la ligne compris, est inchangé ; sans suppression, le
+    texte est renvoyé tel quel.
+    """
+    if not frequent:
+        return text
+
+    spans = [match.span() for match in WORD.finditer(text)]
+    words = [text[start:end] for start, end in spans]
+    keep = [True] * len(words)
+    for i, h in enumerate(shingles(words, shingle_size)):
+        if h in frequent:
+            keep[i:i + shingle_size] = [False] * shingle_size
+    if all(keep):
+        return text
+
+    parts = []
+    cursor = 0  # début du texte restant à recopier
+    i = 0
+    while i < len(words):
+        if keep[i]:
+            i += 1
+            continue
+        j = i
+        while j < len(words) and not keep[j]:
+            j += 1
+        # Mots i..j-1 retirés jusqu'au mot gardé suivant ; en fin de texte, depuis le mot gardé précédent
+        if j < len(words):
+            cut_start, cut_end = spans[i][0], spans[j][0]
+        else:
+            cut_start, cut_end = (spans[i - 1][1] if i > 0 else 0), len(text)
+        parts.append(text[cursor:cut_start])
+        cursor = cut_end
+        i = j
+    parts.append(text[cursor:])
+    return "".join(parts)
+
+def strip_boilerplate_by_lang(corpus_by_lang, shingle_size=SHINGLE_SIZE,
+                              max_doc_fraction=MAX_DOC_FRACTION, min_docs=MIN_DOCS):
+    """
+    Retire les blocs récurrents de chaque langue de {langue: [textes]}.
+    Affiche le nombre de caractères supprimés par langue.
+    """
+    result = {}
+
+    for lang, texts in corpus_by_lang.items():
+        df, n_docs = count_document_frequency(texts, shingle_size)
+        frequent = frequent_shingles(df, n_docs, max_doc_fraction, min_docs)
+
+        cleaned = [strip_text(text, frequent, shingle_size) for text in texts]
+        n_before = sum(len(t) for t in texts)
+        n_after = sum(len(t) for t in cleaned)
+        print_removed(lang, n_before, n_after)
+
+        result[lang] = cleaned
+
+    return result
+
+def iter_stripped_records(corpus_jsonl, shingle_size=SHINGLE_SIZE,
+                          max_doc_fraction=MAX_DOC_FRACTION, min_docs=MIN_DOCS):
+    """
+    Version en flux pour un corpus JSONL {lang, path, text}, une langue à la fois :
+    une lecture compte les shingles de la langue, une seconde génère ses
+    enregistrements nettoyés. Seuls les compteurs d'une langue sont en mémoire.
+    Les documents sortent groupés par langue (ordre d'apparition), soit l'ordre
+    du fichier pour un corpus déjà groupé comme corpus_grouped_by_lang.jsonl.
+    """
+    for lang, offsets in index_jsonl_by_lang(corpus_jsonl).items():
+        texts = (record["text"] for record in iter_jsonl_at(corpus_jsonl, offsets))
+        df, n_docs = count_document_frequency(texts, shingle_size)
+        frequent = frequent_shingles(df, n_docs, max_doc_fraction, min_docs)
+        del df
+
+        n_before = 0
+        n_after = 0
+        for record in iter_jsonl_at(corpus_jsonl, offsets):
+            text = strip_text(record["text"], frequent, shingle_size)
+            n_before += len(record["text"])
+            n_after += len(text)
+            yield {**record, "text": text}
+
+        print_removed(lang, n_before, n_after)
+
+def print_removed(lang, n_before, n_after):
+    removed = n_before - n_after
+    ratio = removed / n_before if n_before else 0.0
+    print(f"[INFO] Boilerplate {lang} : {removed} caractères supprimés ({ratio:.1%})")
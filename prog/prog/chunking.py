@@ -0,0 +1,42 @@
+import re
+
+# Taille maximale d'un morceau (en caractères) envoyé à spaCy
+MAX_CHUNK_CHARS = 20000
+
+PARAGRAPH_BREAK = re.compile(r"\n\s*\n\s*")
+SENTENCE_END = re.compile(r"[.!?…](?:[\"'»”)\]]*)\s+")
+WHITESPACE = re.compile(r"\s+")
+
+def last_boundary(pattern, window):
+    """
+    Position juste après la dernière occurrence du motif dans la fenêtre (0 si aucune).
+    """
+    end = 0
+    for match in pattern.finditer(window):
+        end = match.end()
+    return end
+
+def split_into_chunks(text, max_chars=MAX_CHUNK_CHARS):
+    """
+    Découpe un texte en morceaux d'au plus max_chars caractères.
+    Coupe de préférence entre paragraphes, sinon après une fin de phrase,
+    sinon sur un espace : aucun mot n'est coupé, la tokenisation est donc
+    la même que sur le texte entier.
+    Retourne une liste de (offset, morceau) avec texte[offset:...] == morceau.
+    """
+    chunks = []
+    start = 0
+
+    while len(text) - start > max_chars:
+        window = text[start:start + max_chars]
+        cut = (last_boundary(PARAGRAPH_BREAK, window)
+               or last_boundary(SENTENCE_END, window)
+               or last_boundary(WHITESPACE, window)
+               or max_chars)
+        chunks.append((start, window[:cut]))
+        start += cut
+
+    if start < len(text) or not chunks:
+        chunks.append((start, text[start:]))
+
+    return chunks
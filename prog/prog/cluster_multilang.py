@@ -1,40 +1,104 @@
 import os
 import json
 import numpy as np
+from scipy import sparse
 from sklearn.feature_extraction.text import CountVectorizer
 from sklearn.metrics import pairwise_distances
 from sklearn.cluster import AffinityPropagation
+from jsonl_io import is_jsonl, iter_jsonl
+from lemma_store import LemmaStore, LEMMA_STORE_SUFFIX
+from sparse_similarity import knn_similarity, sparse_affinity_propagation
+from block_similarity import blockwise_similarity, block_rows_for_budget, DEFAULT_MEMORY_MB
+from memmap_similarity import blocked_affinity_propagation, needs_out_of_core, estimate_clustering_mb, check_disk_space
+from hashing_features import hashing_vectorizer, hash_tokens_parallel
+from minhash_similarity import minhash_similarity, sampled_median, DEFAULT_NUM_PERM
 
-def vectorize_tokens(tokens, analyzer='char', ngram_range=(2, 3)):
+def vectorize_tokens(tokens, analyzer='char', ngram_range=(2, 3), n_features=None,
+                     alternate_sign=False, n_workers=1):
     """
     Vectorise la liste de tokens en utilisant CountVectorizer
     (par défaut, n-grammes de caractères).
+    n_features : si donné, n-grammes hachés sur n_features colonnes
+    (HashingVectorizer, sans vocabulaire ; voir hashing_features) ;
+    alternate_sign=True pour des valeurs signées (les cosinus négatifs qui en
+    résultent sont ramenés à 0 par compute_similarity), n_workers > 1 pour répartir
+    la vectorisation sur plusieurs processus.
     """
+    if n_features is not None:
+        vectorizer = hashing_vectorizer(ngram_range, n_features, alternate_sign, analyzer)
+        if n_workers > 1:
+            X = hash_tokens_parallel(tokens, n_workers, ngram_range=ngram_range, n_features=n_features,
+                                     alternate_sign=alternate_sign, analyzer=analyzer)
+        else:
+            X = vectorizer.transform(tokens)
+        return X, vectorizer
+
     vectorizer = CountVectorizer(analyzer=analyzer, ngram_range=ngram_range)
     X = vectorizer.fit_transform(tokens)
     return X, vectorizer
 
-def compute_similarity(X, metric='cosine'):
+def compute_similarity(X, metric='cosine', top_k=None, min_similarity=0.0, block_size=None,
+                       memory_mb=None, condensed=False, out_path=None, lsh_bands=None,
+                       lsh_num_perm=DEFAULT_NUM_PERM):
     """
     Calcule la matrice de similarité à partir de la matrice X.
     (distance cosinus => similarité = 1 - distance)
+    top_k : si donné, renvoie seulement les top_k plus proches voisins de chaque
+    token (cosinus, similarité > min_similarity) sous forme de matrice CSR,
+    calculée par blocs de lignes : mémoire en N*k au lieu de N².
+    memory_mb : si donné, matrice cosinus float32 calculée par blocs dont la taille
+    respecte ce budget (voir block_similarity) ; condensed=True ne garde que
+    le triangle supérieur, pour les traitements qui n'ont pas besoin du carré.
+    out_path : matrice float32 écrite par blocs dans un fichier .npy et renvoyée
+    en memmap (mode hors mémoire, budget memory_mb ou DEFAULT_MEMORY_MB par bloc).
+    lsh_bands : si donné, paires candidates MinHash/LSH (lsh_num_perm permutations
+    en lsh_bands bandes) et cosinus exact sur ces seules paires, en matrice CSR
+    (voir minhash_similarity) : sous-quadratique quand les candidats sont rares.
     """
+    if lsh_bands is not None:
+        return minhash_similarity(X, lsh_num_perm, lsh_bands, min_similarity)
+    if top_k is not None:
+        return knn_similarity(X, top_k, min_similarity, block_size)
+    if memory_mb is not None or out_path is not None:
+        return blockwise_similarity(X, memory_mb or DEFAULT_MEMORY_MB, condensed, out_path=out_path)
+
     dist_matrix = pairwise_distances(X, metric=metric)
     similarity = 1.0 - dist_matrix
+    # Bornée à [0, 1] comme les autres modes : avec des n-grammes hachés signés
+    # (alternate_sign=True), le cosinus peut être négatif
+    np.clip(similarity, 0.0, 1.0, out=similarity)
     return similarity
 
-def run_affinity_propagation(similarity_matrix, random_state=42):
+def run_affinity_propagation(similarity_matrix, random_state=42, memory_mb=DEFAULT_MEMORY_MB, preference=None):
     """
     Exécute l'algo AffinityPropagation sur la matrice de similarité.
     Retourne (labels, cluster_centers_indices).
+    Une matrice creuse (compute_similarity avec top_k ou lsh_bands) est traitée par
+    sparse_affinity_propagation, sur ses seules arêtes ; sa préférence par défaut
+    (médiane des arêtes stockées, donc des voisins les plus proches) est plus haute
+    qu'en mode dense et donne davantage de clusters (preference permet de la fixer).
+    Une matrice memmap (compute_similarity avec out_path) est traitée par blocs
+    de lignes (memory_mb par bloc), messages stockés sur disque à côté d'elle.
     """
+    if sparse.issparse(similarity_matrix):
+        return sparse_affinity_propagation(similarity_matrix, preference, damping=0.7, max_iter=1000,
+                                           convergence_iter=15, random_state=random_state)
+
+    if isinstance(similarity_matrix, np.memmap):
+        block_rows = block_rows_for_budget(similarity_matrix.shape[0], memory_mb / 3)
+        return blocked_affinity_propagation(similarity_matrix, os.path.dirname(similarity_matrix.filename),
+                                            block_rows, damping=0.7, max_iter=1000,
+                                            convergence_iter=15, random_state=random_state)
+
     ap = AffinityPropagation(
         affinity='precomputed',
         random_state=random_state,
         max_iter=1000,
         damping=0.7,
         preference=np.median(similarity_matrix),
-        convergence_iter=15
+        convergence_iter=15,
+        # Matrice float32 calculée par blocs : AffinityPropagation peut la modifier sur place
+        copy=similarity_matrix.dtype != np.float32
     )
     ap.fit(similarity_matrix)
     return ap.labels_, ap.cluster_centers_indices_
@@ -62,46 +126,153 @@ def build_clusters_dict(labels, centers_idx, tokens):
 
     return clusters
 
-def cluster_all_languages(input_path, output_path, ngram_range=(2, 3)):
+def collect_lemmes_by_lang(input_path):
     """
-    Pour chaque langue, applique un clustering sur les lemmes.
-    Stocke les résultats dans un fichier JSON.
+    Rassemble l'ensemble des lemmes distincts de chaque langue.
+    Un fichier .jsonl est lu document par document : seul le vocabulaire
+    est gardé en mémoire. Un stockage en colonnes (.lemmes.npz, voir lemma_store)
+    est lu sans reconstruire les listes de lemmes des documents.
     """
+    if input_path.endswith(LEMMA_STORE_SUFFIX):
+        store = LemmaStore(input_path)
+        return {lang: store.unique_lemmes(lang) for lang in store.langs}
+
+    lemmes_by_lang = {}
+
+    if is_jsonl(input_path):
+        for record in iter_jsonl(input_path):
+            lemmes_by_lang.setdefault(record["lang"], set()).update(record.get("lemmes", []))
+        return lemmes_by_lang
+
     with open(input_path, "r", encoding="utf-8") as f:
         data = json.load(f)
 
-    results = {}
-
     for lang, docs in data.items():
-        print(f"[INFO] Clustering langue : {lang} avec ngrammes {ngram_range}")
-
-        # Rassembler tous les lemmes de cette langue
-        all_lemmes = []
+        lemmes = lemmes_by_lang.setdefault(lang, set())
         for doc in docs:
-            all_lemmes.extend(doc.get("lemmes", []))
+            lemmes.update(doc.get("lemmes", []))
+
+    return lemmes_by_lang
+
+def vectorize_ngram_ranges(tokens, ngram_ranges, analyzer='char', n_features=None,
+                           alternate_sign=False, n_workers=1):
+    """
+    Vectorise une seule fois sur l'union des plages de n-grammes, puis extrait
+    les colonnes de chaque plage : {ngram_range: X}. Le vocabulaire étant trié,
+    chaque X est identique à celui de vectorize_tokens(tokens, ngram_range=...).
+    Avec n_features (hachage), les colonnes ne disent plus la longueur des
+    n-grammes : chaque plage est hachée séparément (sans ajustement, donc peu coûteux).
+    """
+    if n_features is not None:
+        return {tuple(ngram_range): vectorize_tokens(tokens, analyzer, ngram_range, n_features,
+                                                     alternate_sign, n_workers)[0]
+                for ngram_range in ngram_ranges}
+
+    union = (min(lo for lo, _ in ngram_ranges), max(hi for _, hi in ngram_ranges))
+    X, vectorizer = vectorize_tokens(tokens, analyzer=analyzer, ngram_range=union)
+    lengths = np.array([len(feature) for feature in vectorizer.get_feature_names_out()])
+
+    X = X.tocsc()
+    matrices = {}
+    for lo, hi in ngram_ranges:
+        columns = np.flatnonzero((lengths >= lo) & (lengths <= hi))
+        matrices[(lo, hi)] = X[:, columns].tocsr()
+    return matrices
 
+def cluster_tokens(lang, tokens, X, top_k=None, min_similarity=0.0, memory_mb=None,
+                   out_of_core=None, work_dir="similarity_memmap", lsh_bands=None,
+                   lsh_num_perm=DEFAULT_NUM_PERM):
+    """
+    Similarité + AffinityPropagation pour les tokens d'une langue (X : n-grammes).
+    Retourne le dictionnaire de clusters.
+    """
+    # Similarité (sur disque si la matrice ne tient pas en mémoire, où elle serait
+    # en float32 avec memory_mb et en float64 sinon)
+    out_path = None
+    dtype = np.float32 if memory_mb is not None else np.float64
+    if top_k is None and lsh_bands is None and (out_of_core or (out_of_core is None and needs_out_of_core(len(tokens), dtype=dtype))):
+        print(f"[INFO] {lang} : mode hors mémoire ({len(tokens)} lemmes, "
+              f"~{estimate_clustering_mb(len(tokens), dtype):.0f} Mo en mémoire) → {work_dir}")
+        os.makedirs(work_dir, exist_ok=True)
+        check_disk_space(len(tokens), work_dir)
+        out_path = os.path.join(work_dir, f"similarity_{lang}.npy")
+
+    try:
+        similarity_matrix = compute_similarity(X, top_k=top_k, min_similarity=min_similarity,
+                                               memory_mb=memory_mb, out_path=out_path,
+                                               lsh_bands=lsh_bands, lsh_num_perm=lsh_num_perm)
+
+        # Clustering (LSH : préférence du mode dense, estimée sur des paires tirées au hasard)
+        preference = sampled_median(X) if lsh_bands is not None else None
+        labels, centers_idx = run_affinity_propagation(similarity_matrix, memory_mb=memory_mb or DEFAULT_MEMORY_MB,
+                                                       preference=preference)
+    finally:
+        # Matrice sur disque (N² x 4 octets) supprimée même après une interruption
+        similarity_matrix = None
+        if out_path is not None and os.path.exists(out_path):
+            os.remove(out_path)
+
+    # Dictionnaire de clusters
+    return build_clusters_dict(labels, centers_idx, tokens)
+
+def cluster_all_ranges(input_path, outputs, top_k=None, min_similarity=0.0,
+                       memory_mb=None, out_of_core=None, work_dir=None, n_features=None,
+                       alternate_sign=False, n_workers=1, lsh_bands=None, lsh_num_perm=DEFAULT_NUM_PERM):
+    """
+    Clustering des lemmes de chaque langue pour plusieurs plages de n-grammes.
+    outputs : {ngram_range: chemin du JSON de sortie}, ex :
+    {(2, 3): "clusters_ngrams_2_3.json", (4, 5): "clusters_ngrams_4_5.json"}.
+    Les données ne sont lues qu'une fois et les n-grammes extraits en un seul
+    passage par langue (voir vectorize_ngram_ranges) : chaque plage
+    supplémentaire ne coûte que son clustering.
+    input_path : processed_multilang.json, .jsonl ou .lemmes.npz
+    top_k / min_similarity : graphe creux des plus proches voisins (voir compute_similarity).
+    memory_mb : matrice complète en float32, calculée par blocs sous ce budget.
+    out_of_core : matrice et messages d'AffinityPropagation sur disque (memmap dans
+    work_dir) ; None = automatique si l'estimation en N² dépasse la mémoire disponible.
+    n_features / alternate_sign / n_workers : n-grammes hachés (voir vectorize_tokens).
+    lsh_bands / lsh_num_perm : graphe creux des paires candidates MinHash/LSH
+    (voir compute_similarity ; rappel mesuré par bench_lsh.py).
+    """
+    if work_dir is None:
+        first_output = next(iter(outputs.values()))
+        work_dir = os.path.join(os.path.dirname(first_output) or ".", "similarity_memmap")
+    lemmes_by_lang = collect_lemmes_by_lang(input_path)
+
+    results = {ngram_range: {} for ngram_range in outputs}
+
+    for lang, all_lemmes in lemmes_by_lang.items():
         # Nettoyage : dédoublonner + ignorer les très courts
-        tokens = sorted(set([t for t in all_lemmes if len(t) >= 3]))
+        tokens = sorted(t for t in all_lemmes if len(t) >= 3)
         if len(tokens) < 5:
             print(f"[WARN] Pas assez de lemmes pour clusteriser {lang}.")
             continue
 
-        # Vectorisation
-        X, _ = vectorize_tokens(tokens, analyzer="char", ngram_range=ngram_range)
-
-        # Similarité
-        similarity_matrix = compute_similarity(X)
-
-        # Clustering
-        labels, centers_idx = run_affinity_propagation(similarity_matrix)
-
-        # Dictionnaire de clusters
-        clusters = build_clusters_dict(labels, centers_idx, tokens)
+        # Vectorisation (une seule pour toutes les plages)
+        matrices = vectorize_ngram_ranges(tokens, list(outputs), n_features=n_features,
+                                          alternate_sign=alternate_sign, n_workers=n_workers)
 
-        results[lang] = clusters
-        print(f"→ {lang} : {len(clusters)} clusters trouvés.")
+        for ngram_range, X in matrices.items():
+            print(f"[INFO] Clustering langue : {lang} avec ngrammes {ngram_range}")
+            clusters = cluster_tokens(lang, tokens, X, top_k, min_similarity, memory_mb,
+                                      out_of_core, work_dir, lsh_bands, lsh_num_perm)
+            results[ngram_range][lang] = clusters
+            print(f"→ {lang} : {len(clusters)} clusters trouvés.")
 
-    with open(output_path, "w", encoding="utf-8") as f:
-        json.dump(results, f, ensure_ascii=False, indent=2)
+    for ngram_range, output_path in outputs.items():
+        with open(output_path, "w", encoding="utf-8") as f:
+            json.dump(results[ngram_range], f, ensure_ascii=False, indent=2)
+        print(f"[OK] Clusters sauvegardés dans : {output_path}")
 
-    print(f"[OK] Clusters sauvegardés dans : {output_path}")
+def cluster_all_languages(input_path, output_path, ngram_range=(2, 3), top_k=None, min_similarity=0.0,
+                          memory_mb=None, out_of_core=None, work_dir=None, n_features=None,
+                          alternate_sign=False, n_workers=1, lsh_bands=None,
+                          lsh_num_perm=DEFAULT_NUM_PERM):
+    """
+    Pour chaque langue, applique un clustering sur les lemmes.
+    Stocke les résultats dans un fichier JSON.
+    Plage unique de cluster_all_ranges (mêmes options).
+    """
+    cluster_all_ranges(input_path, {tuple(ngram_range): output_path}, top_k, min_similarity,
+                       memory_mb, out_of_core, work_dir, n_features, alternate_sign, n_workers,
+                       lsh_bands, lsh_num_perm)
@@ -0,0 +1,159 @@
+import os
+import sys
+import json
+import mmap
+import zlib
+import struct
+import argparse
+
+# Archive du corpus en un seul fichier :
+#   MAGIC | blocs zlib (texte, html éventuel) | index JSON zlib | offset de l'index (8 octets)
+# L'index donne pour chaque document sa langue, son chemin et la position
+# (offset, longueur) de ses blocs : chaque document est lisible seul.
+MAGIC = b"SRBNPACK1\n"
+FOOTER = struct.Struct("<Q")
+
+def pack_corpus(documents, archive_path, base_dir=None):
+    """
+    Écrit les documents (langue, chemin relatif, texte) dans une archive,
+    ex : documents = iter_corpus_documents(base_dir).
+    Si base_dir est donné, le HTML brut de chaque fichier est aussi stocké.
+    """
+    index = []
+
+    with open(archive_path, "wb") as f:
+        f.write(MAGIC)
+
+        for lang, path, text in documents:
+            entry = {"lang": lang, "path": path, "text": write_block(f, text.encode("utf-8"))}
+
+            if base_dir is not None:
+                with open(os.path.join(base_dir, path), "rb") as f_html:
+                    entry["html"] = write_block(f, f_html.read())
+
+            index.append(entry)
+
+        index_offset = f.tell()
+        f.write(zlib.compress(json.dumps(index, ensure_ascii=False).encode("utf-8")))
+        f.write(FOOTER.pack(index_offset))
+
+    size_mb = os.path.getsize(archive_path) / (1024 * 1024)
+    print(f"[OK] Archive écrite : {archive_path} ({len(index)} documents, {size_mb:.1f} Mo)")
+
+def write_block(f, data):
+    offset = f.tell()
+    block = zlib.compress(data)
+    f.write(block)
+    return [offset, len(block)]
+
+class CorpusArchive:
+    """
+    Lecture d'une archive de corpus par mmap : seul l'index est chargé,
+    les documents sont décompressés à la demande.
+    """
+
+    def __init__(self, archive_path):
+        self.file = open(archive_path, "rb")
+        self.mm = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if self.mm[:len(MAGIC)] != MAGIC:
+            self.close()
+            raise ValueError(f"{archive_path} n'est pas une archive de corpus.")
+
+        footer_start = len(self.mm) - FOOTER.size
+        (index_offset,) = FOOTER.unpack(self.mm[footer_start:])
+        self.index = json.loads(zlib.decompress(self.mm[index_offset:footer_start]))
+
+        self.by_lang = {}
+        for i, entry in enumerate(self.index):
+            self.by_lang.setdefault(entry["lang"], []).append(i)
+
+    def __len__(self):
+        return len(self.index)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.mm.close()
+        self.file.close()
+
+    def read_block(self, position):
+        offset, length = position
+        return zlib.decompress(self.mm[offset:offset + length])
+
+    def get_text(self, i):
+        return self.read_block(self.index[i]["text"]).decode("utf-8")
+
+    def get_html(self, i):
+        """
+        HTML brut du document i (None si l'archive a été créée sans).
+        """
+        position = self.index[i].get("html")
+        return self.read_block(position) if position else None
+
+    def iter_documents(self, lang=None):
+        """
+        Génère (langue, chemin, texte), éventuellement pour une seule langue.
+        """
+        indices = self.by_lang.get(lang, []) if lang is not None else range(len(self.index))
+        for i in indices:
+            entry = self.index[i]
+            yield entry["lang"], entry["path"], self.get_text(i)
+
+def iter_archive_documents(archive_path):
+    """
+    Équivalent de iter_corpus_documents à partir d'une archive.
+    """
+    with CorpusArchive(archive_path) as archive:
+        for lang, indices in archive.by_lang.items():
+            yield from archive.iter_documents(lang)
+            print(f"[INFO] {lang} : {len(indices)} fichiers chargés (archive).")
+
+def unpack_corpus(archive_path, output_dir):
+    """
+    Restaure le contenu de l'archive : textes en .txt, et HTML d'origine s'il a été stocké.
+    """
+    with CorpusArchive(archive_path) as archive:
+        for i, entry in enumerate(archive.index):
+            out_path = os.path.join(output_dir, entry["path"])
+            os.makedirs(os.path.dirname(out_path), exist_ok=True)
+
+            with open(os.path.splitext(out_path)[0] + ".txt", "w", encoding="utf-8") as f:
+                f.write(archive.get_text(i))
+
+            html = archive.get_html(i)
+            if html is not None:
+                with open(out_path, "wb") as f:
+                    f.write(html)
+
+        print(f"[OK] {len(archive)} documents restaurés dans : {output_dir}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Archive du corpus HTML en un seul fichier.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_pack = sub.add_parser("pack", help="extrait le corpus et crée l'archive")
+    p_pack.add_argument("base_dir")
+    p_pack.add_argument("archive")
+    p_pack.add_argument("--html", action="store_true", help="stocke aussi le HTML brut")
+    p_pack.add_argument("--workers", type=int, default=1)
+
+    p_unpack = sub.add_parser("unpack", help="restaure les fichiers de l'archive")
+    p_unpack.add_argument("archive")
+    p_unpack.add_argument("output_dir")
+
+    args = parser.parse_args(argv)
+    if args.command == "pack":
+        # Import local : html_loader importe lui-même ce module (mode archive)
+        from html_loader import iter_corpus_documents
+        documents = iter_corpus_documents(args.base_dir, n_workers=args.workers)
+        pack_corpus(documents, args.archive, base_dir=args.base_dir if args.html else None)
+    else:
+        unpack_corpus(args.archive, args.output_dir)
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,143 @@
+import os
+import json
+import random
+
+# Sous-dossiers reconnus comme partition du corpus (base_dir/langue/split/...)
+SPLITS = ("appr", "test")
+
+def scan_corpus(base_dir, extensions=(".html",)):
+    """
+    Parcourt base_dir une seule fois avec os.scandir.
+    Retourne (langues, entrées, mtimes des dossiers) où chaque entrée vaut
+    {"lang", "split", "path" (relatif à base_dir), "size", "mtime"}.
+    extensions=None : tous les fichiers sont retenus.
+    """
+    langs = []
+    entries = []
+    # base_dir lui-même : l'ajout ou la suppression d'un dossier de langue change son mtime
+    dir_mtimes = {".": os.stat(base_dir).st_mtime_ns}
+
+    for lang_entry in sorted(os.scandir(base_dir), key=lambda e: e.name):
+        if not lang_entry.is_dir() or lang_entry.name.startswith("."):
+            continue
+        langs.append(lang_entry.name)
+
+        stack = [lang_entry.path]
+        while stack:
+            dir_path = stack.pop()
+            dir_mtimes[os.path.relpath(dir_path, base_dir)] = os.stat(dir_path).st_mtime_ns
+
+            for entry in sorted(os.scandir(dir_path), key=lambda e: e.name):
+                if entry.name.startswith("."):
+                    continue
+                if entry.is_dir():
+                    stack.append(entry.path)
+                    continue
+                if extensions and not entry.name.endswith(tuple(extensions)):
+                    continue
+
+                rel_path = os.path.relpath(entry.path, base_dir)
+                parts = rel_path.split(os.sep)
+                split = parts[1] if len(parts) > 2 and parts[1] in SPLITS else None
+                st = entry.stat()
+                entries.append({
+                    "lang": lang_entry.name,
+                    "split": split,
+                    "path": rel_path,
+                    "size": st.st_size,
+                    "mtime": st.st_mtime_ns
+                })
+
+    entries.sort(key=lambda e: e["path"])
+    return langs, entries, dir_mtimes
+
+class CorpusManifest:
+    """
+    Index du corpus (langue, split, chemin, taille, mtime) construit en un
+    seul parcours, avec des index par langue et par split pour les requêtes.
+    """
+
+    def __init__(self, base_dir, langs, entries, dir_mtimes=None, extensions=(".html",)):
+        self.base_dir = base_dir
+        self.langs = langs
+        self.entries = entries
+        self.dir_mtimes = dir_mtimes or {}
+        self.extensions = extensions
+
+        self.by_lang = {lang: [] for lang in langs}
+        self.by_split = {}
+        for i, entry in enumerate(entries):
+            self.by_lang.setdefault(entry["lang"], []).append(i)
+            self.by_split.setdefault(entry["split"], []).append(i)
+
+    @classmethod
+    def build(cls, base_dir, extensions=(".html",)):
+        langs, entries, dir_mtimes = scan_corpus(base_dir, extensions)
+        print(f"[INFO] Manifeste : {len(entries)} fichiers, {len(langs)} langues dans {base_dir}")
+        return cls(base_dir, langs, entries, dir_mtimes, extensions)
+
+    @classmethod
+    def load_or_build(cls, base_dir, manifest_path=None, extensions=(".html",)):
+        """
+        Reparcourt le corpus (un seul passage scandir, dont les stat fournissent
+        taille et mtime de chaque fichier) et le compare au manifeste sauvegardé :
+        mêmes langues, mêmes fichiers aux mêmes (taille, mtime), mêmes mtimes de
+        dossiers. Une modification sur place ne change pas le mtime du dossier,
+        d'où la comparaison fichier par fichier. Le fichier n'est réécrit que si
+        le corpus a changé.
+        """
+        langs, entries, dir_mtimes = scan_corpus(base_dir, extensions)
+        wanted = list(extensions) if extensions else None
+        manifest = cls(base_dir, langs, entries, dir_mtimes, extensions)
+
+        if manifest_path and os.path.exists(manifest_path):
+            with open(manifest_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            saved = (data.get("extensions"), data["langs"], data["entries"], data["dir_mtimes"])
+            if saved == (wanted, langs, entries, dir_mtimes):
+                return manifest
+            print("[INFO] Manifeste périmé, corpus modifié depuis la dernière sauvegarde.")
+
+        print(f"[INFO] Manifeste : {len(entries)} fichiers, {len(langs)} langues dans {base_dir}")
+        if manifest_path:
+            manifest.save(manifest_path)
+        return manifest
+
+    def save(self, manifest_path):
+        data = {
+            "langs": self.langs,
+            "entries": self.entries,
+            "dir_mtimes": self.dir_mtimes,
+            "extensions": list(self.extensions) if self.extensions else None
+        }
+        with open(manifest_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+
+    def query(self, lang=None, split=None):
+        """
+        Entrées filtrées par langue et/ou split ("appr", "test").
+        """
+        if lang is not None:
+            idx = self.by_lang.get(lang, [])
+            if split is not None:
+                idx = [i for i in idx if self.entries[i]["split"] == split]
+        elif split is not None:
+            idx = self.by_split.get(split, [])
+        else:
+            idx = range(len(self.entries))
+        return [self.entries[i] for i in idx]
+
+    def paths(self, lang=None, split=None):
+        """
+        Chemins complets (base_dir/...) des fichiers sélectionnés.
+        """
+        return [os.path.join(self.base_dir, e["path"]) for e in self.query(lang, split)]
+
+    def sample(self, n, lang=None, split=None, seed=42):
+        """
+        Échantillon reproductible de n entrées.
+        """
+        entries = self.query(lang, split)
+        if n >= len(entries):
+            return entries
+        return random.Random(seed).sample(entries, n)
@@ -0,0 +1,155 @@
+import os
+import json
+import hashlib
+
+def file_hash(filepath):
+    """
+    Empreinte du contenu d'un fichier (blake2b, lecture par blocs).
+    """
+    h = hashlib.blake2b(digest_size=16)
+    with open(filepath, "rb") as f:
+        for block in iter(lambda: f.read(1 << 16), b""):
+            h.update(block)
+    return h.hexdigest()
+
+class ExtractionCache:
+    """
+    Cache disque des textes extraits, indexé par (chemin, taille, mtime, hash),
+    valable seulement pour le backend HTML qui a produit le texte.
+    - autre backend : miss (les backends n'extraient pas exactement le même texte)
+    - taille + mtime identiques : hit sans relire le fichier
+    - sinon le contenu est hashé : même hash => hit (fichier seulement "touché")
+    - sinon miss : le fichier doit être ré-extrait
+    Fichier JSONL en ajout seul, une ligne {"path", "size", "mtime", "hash",
+    "backend", "text"} par extraction (la dernière ligne d'un chemin l'emporte) ;
+    un fichier seulement touché ajoute une ligne sans texte qui renvoie ("offset")
+    à celle qui le contient. Seul l'index {chemin: (size, mtime, hash, backend, offset)}
+    est gardé en mémoire, les textes sont relus à la demande.
+    """
+
+    def __init__(self, cache_path):
+        self.cache_path = cache_path
+        self.index = {}
+        self.pending = {}
+        self.seen = set()
+        self.n_lines = 0
+        self.hits = 0
+        self.misses = 0
+        self.bytes_saved = 0
+
+        self.file = open(cache_path, "a+b")
+        self.file.seek(0)
+        offset = 0
+        try:
+            for line in self.file:
+                if not line.endswith(b"\n"):
+                    break
+                entry = json.loads(line)
+                text_offset = offset if "text" in entry else entry["offset"]
+                self.index[entry["path"]] = (entry["size"], entry["mtime"], entry["hash"],
+                                             entry["backend"], text_offset)
+                self.n_lines += 1
+                offset += len(line)
+        except (ValueError, KeyError) as e:
+            print(f"[WARN] Cache d'extraction illisible, il sera reconstruit : {e}")
+            self.index = {}
+            self.n_lines = 0
+            offset = 0
+
+        # Une ligne tronquée (exécution interrompue) est ignorée et écrasée
+        self.file.truncate(offset)
+
+    def get(self, filepath, backend=None):
+        """
+        Retourne le texte en cache pour ce fichier et ce backend, ou None s'il
+        faut l'extraire (y compris si le fichier a disparu depuis le parcours).
+        """
+        key = os.path.abspath(filepath)
+        self.seen.add(key)
+        entry = self.index.get(key)
+        if entry and entry[3] != backend:
+            entry = None
+
+        try:
+            st = os.stat(filepath)
+            if entry and entry[0] == st.st_size and entry[1] == st.st_mtime_ns:
+                return self.hit(entry, st.st_size)
+            digest = file_hash(filepath)
+        except OSError:
+            self.misses += 1
+            return None
+
+        fingerprint = {"path": key, "size": st.st_size, "mtime": st.st_mtime_ns,
+                       "hash": digest, "backend": backend}
+        if entry and entry[2] == digest:
+            self.append({**fingerprint, "offset": entry[4]})
+            return self.hit(entry, st.st_size)
+
+        self.misses += 1
+        self.pending[key] = fingerprint
+        return None
+
+    def hit(self, entry, size):
+        self.hits += 1
+        self.bytes_saved += size
+        return self.read_text(entry[4])
+
+    def read_text(self, offset):
+        self.file.seek(offset)
+        return json.loads(self.file.readline())["text"]
+
+    def append(self, record):
+        """
+        Ajoute une ligne en fin de fichier et met l'index à jour.
+        """
+        self.file.seek(0, os.SEEK_END)
+        offset = self.file.tell()
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        self.file.write(line.encode("utf-8"))
+        self.index[record["path"]] = (record["size"], record["mtime"], record["hash"],
+                                      record["backend"], record.get("offset", offset))
+        self.n_lines += 1
+
+    def put(self, filepath, text):
+        """
+        Enregistre le texte extrait d'un fichier passé par get() (miss).
+        Les échecs d'extraction (None) ne sont pas mis en cache.
+        """
+        key = os.path.abspath(filepath)
+        fingerprint = self.pending.pop(key, None)
+        if fingerprint is None or text is None:
+            return
+        self.append({**fingerprint, "text": text})
+
+    def save(self):
+        """
+        Termine le cache sur disque. Quand plus de la moitié des lignes sont
+        périmées (fichiers modifiés, touchés ou disparus du corpus), le fichier
+        est réécrit avec les seules entrées vivantes.
+        """
+        if self.seen:
+            self.index = {k: v for k, v in self.index.items() if k in self.seen}
+        if self.n_lines > 2 * len(self.index):
+            self.compact()
+        self.file.close()
+
+    def compact(self):
+        tmp_path = self.cache_path + ".tmp"
+        index = {}
+        with open(tmp_path, "wb") as out:
+            for key, (size, mtime, digest, backend, offset) in self.index.items():
+                index[key] = (size, mtime, digest, backend, out.tell())
+                record = {"path": key, "size": size, "mtime": mtime, "hash": digest,
+                          "backend": backend, "text": self.read_text(offset)}
+                out.write((json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8"))
+        self.file.close()
+        os.replace(tmp_path, self.cache_path)
+        self.file = open(self.cache_path, "a+b")
+        self.index = index
+        self.n_lines = len(index)
+
+    def print_stats(self):
+        total = self.hits + self.misses
+        rate = self.hits / total if total else 0.0
+        print(f"[CACHE] {self.hits} hits / {self.misses} misses ({rate:.1%}) | "
+              f"{self.bytes_saved / (1024 * 1024):.1f} Mo de HTML non re-parsés")
@@ -0,0 +1,60 @@
+from functools import partial
+from multiprocessing import Pool
+from scipy import sparse
+from sklearn.feature_extraction.text import HashingVectorizer
+
+# N-grammes de caractères par hachage : pas de vocabulaire à apprendre, donc
+# pas de passage d'ajustement, une mémoire fixe (n_features colonnes) et des
+# colonnes identiques d'une exécution à l'autre. Les matrices de lots ou de
+# processus différents s'empilent directement (merge_shards).
+DEFAULT_N_FEATURES = 2 ** 20
+
+def hashing_vectorizer(ngram_range=(2, 3), n_features=DEFAULT_N_FEATURES, alternate_sign=False,
+                       analyzer='char'):
+    """
+    alternate_sign=False : comptes positifs (comme CountVectorizer, cosinus >= 0) ;
+    True : signe aléatoire par n-gramme, qui compense en moyenne les collisions.
+    """
+    return HashingVectorizer(analyzer=analyzer, ngram_range=ngram_range, n_features=n_features,
+                             alternate_sign=alternate_sign, norm=None)
+
+def hash_tokens(tokens, ngram_range=(2, 3), n_features=DEFAULT_N_FEATURES, alternate_sign=False,
+                analyzer='char'):
+    """
+    Matrice CSR (len(tokens) x n_features) des n-grammes hachés.
+    """
+    return hashing_vectorizer(ngram_range, n_features, alternate_sign, analyzer).transform(tokens)
+
+def iter_hashed_batches(tokens, batch_size=10000, ngram_range=(2, 3), n_features=DEFAULT_N_FEATURES,
+                        alternate_sign=False, analyzer='char'):
+    """
+    Vectorisation en flux : génère une matrice par lot de batch_size tokens
+    (tokens peut être un générateur).
+    """
+    vectorizer = hashing_vectorizer(ngram_range, n_features, alternate_sign, analyzer)
+    batch = []
+    for token in tokens:
+        batch.append(token)
+        if len(batch) == batch_size:
+            yield vectorizer.transform(batch)
+            batch = []
+    if batch:
+        yield vectorizer.transform(batch)
+
+def merge_shards(shards):
+    """
+    Empile les matrices de plusieurs lots/processus (mêmes colonnes par construction).
+    """
+    return sparse.vstack(list(shards), format="csr")
+
+def hash_tokens_parallel(tokens, n_workers=None, shard_size=10000, ngram_range=(2, 3),
+                         n_features=DEFAULT_N_FEATURES, alternate_sign=False, analyzer='char'):
+    """
+    Vectorisation répartie en morceaux de shard_size tokens sur n_workers processus,
+    puis fusion dans l'ordre des tokens.
+    """
+    shards = [tokens[i:i + shard_size] for i in range(0, len(tokens), shard_size)]
+    worker = partial(hash_tokens, ngram_range=ngram_range, n_features=n_features,
+                     alternate_sign=alternate_sign, analyzer=analyzer)
+    with Pool(n_workers) as pool:
+        return merge_shards(pool.imap(worker, shards))
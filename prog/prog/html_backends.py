@@ -0,0 +1,107 @@
+from html.parser import HTMLParser
+from bs4 import BeautifulSoup
+
+# Backends disponibles pour l'extraction du texte HTML :
+# - "html.parser" : BeautifulSoup + parseur pur Python (comportement historique)
+# - "lxml"        : BeautifulSoup + lxml (si installé)
+# - "stream"      : HTMLParser en flux, ne construit pas d'arbre
+DEFAULT_BACKEND = "html.parser"
+BACKENDS = ["html.parser", "lxml", "stream"]
+
+# Contenus ignorés par get_text() (chaînes Script / Stylesheet / TemplateString de bs4)
+SKIPPED_TAGS = {"script", "style", "template"}
+
+try:
+    import lxml  # noqa: F401
+    HAS_LXML = True
+except ImportError:
+    HAS_LXML = False
+
+
+class TextCollector(HTMLParser):
+    """
+    Parseur HTML en flux qui ne garde que les nœuds texte.
+    Reproduit soup.get_text(separator=" ", strip=True) :
+    chaque nœud texte est nettoyé (strip), les vides sont ignorés,
+    et les nœuds sont joints par un espace.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts = []
+        self.buffer = []
+        self.skip_depth = 0
+
+    def flush(self):
+        # Comme bs4, les morceaux de texte consécutifs forment un seul nœud
+        if self.buffer:
+            text = "".join(self.buffer).strip()
+            if text and not self.skip_depth:
+                self.parts.append(text)
+            self.buffer = []
+
+    def handle_starttag(self, tag, attrs):
+        self.flush()
+        if tag in SKIPPED_TAGS:
+            self.skip_depth += 1
+
+    def handle_startendtag(self, tag, attrs):
+        self.flush()
+
+    def handle_endtag(self, tag):
+        self.flush()
+        if tag in SKIPPED_TAGS and self.skip_depth:
+            self.skip_depth -= 1
+
+    def handle_data(self, data):
+        self.buffer.append(data)
+
+    def handle_comment(self, data):
+        self.flush()
+
+    def handle_decl(self, decl):
+        self.flush()
+
+    def handle_pi(self, data):
+        self.flush()
+
+    def unknown_decl(self, data):
+        self.flush()
+        # Les sections CDATA sont conservées par get_text()
+        if data.startswith("CDATA["):
+            self.buffer.append(data[len("CDATA["):])
+            self.flush()
+
+    def get_text(self):
+        self.close()
+        self.flush()
+        return " ".join(self.parts)
+
+
+def resolve_backend(backend):
+    """
+    Vérifie le nom du backend et bascule sur html.parser si lxml est absent.
+    À appeler une fois avant une extraction en masse.
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Backend HTML inconnu : {backend} (choix : {BACKENDS})")
+
+    if backend == "lxml" and not HAS_LXML:
+        print("[WARN] lxml n'est pas installé, utilisation de html.parser.")
+        return "html.parser"
+
+    return backend
+
+
+def html_to_text(html, backend=DEFAULT_BACKEND):
+    """
+    Extrait le texte d'une chaîne HTML avec le backend choisi.
+    Sortie équivalente à BeautifulSoup(...).get_text(separator=" ", strip=True).
+    """
+    if backend == "stream":
+        parser = TextCollector()
+        parser.feed(html)
+        return parser.get_text()
+
+    soup = BeautifulSoup(html, backend)
+    return soup.get_text(separator=" ", strip=True)
@@ -1,47 +1,136 @@
 import os
-import glob
 import json
-from bs4 import BeautifulSoup
+from functools import partial
+from multiprocessing import Pool
+from html_backends import DEFAULT_BACKEND, html_to_text, resolve_backend
+from jsonl_io import write_jsonl
+from corpus_manifest import CorpusManifest
+from corpus_archive import iter_archive_documents
 
-def extract_text_from_html(filepath):
+def extract_text_from_html(filepath, backend=DEFAULT_BACKEND):
     try:
         with open(filepath, "r", encoding="utf-8") as f:
             html = f.read()
-        soup = BeautifulSoup(html, "html.parser")
-        text = soup.get_text(separator=" ", strip=True)
+        text = html_to_text(html, backend)
         return text
     except Exception as e:
         print(f"[ERREUR] {filepath} : {e}")
         return None
 
-def load_corpus_by_language(base_dir):
+def extract_path_and_text(filepath, backend=DEFAULT_BACKEND):
+    return filepath, extract_text_from_html(filepath, backend)
+
+def extract_texts_parallel(pool, filepaths, chunksize=16, ordered=True, backend=DEFAULT_BACKEND):
+    """
+    Extrait le texte d'une liste de fichiers HTML avec un pool de processus.
+    - chunksize : nombre de fichiers envoyés à un worker par tâche
+    - ordered : si False, les textes arrivent dans l'ordre de fin de traitement
+    Génère des couples (chemin, texte) ; les erreurs sont signalées par
+    extract_text_from_html (texte None pour le fichier).
+    """
+    extract = partial(extract_path_and_text, backend=backend)
+    if ordered:
+        return pool.imap(extract, filepaths, chunksize=chunksize)
+    return pool.imap_unordered(extract, filepaths, chunksize=chunksize)
+
+def merge_with_cache(filepaths, cached, extracted, ordered=True):
+    """
+    Recombine les textes trouvés dans le cache ({chemin: texte}) et les
+    couples (chemin, texte) ré-extraits, dans l'ordre des fichiers si ordered.
+    """
+    if not ordered:
+        yield from cached.items()
+        yield from extracted
+        return
+
+    extracted = iter(extracted)
+    for path in filepaths:
+        if path in cached:
+            yield path, cached[path]
+        else:
+            yield next(extracted)
+
+def iter_corpus_documents(base_dir, n_workers=1, chunksize=16, ordered=True,
+                          backend=DEFAULT_BACKEND, cache=None, manifest=None,
+                          archive_path=None):
+    """
+    Parcourt base_dir/langue/**.html et génère (langue, chemin relatif, texte)
+    pour chaque fichier valide, sans garder le corpus en mémoire.
+
+    Si n_workers est différent de 1, l'extraction se fait dans un pool de
+    processus partagé par toutes les langues (n_workers=None = tous les cœurs).
+    backend : "html.parser", "lxml" ou "stream" (voir html_backends).
+    cache : ExtractionCache optionnel, seuls les fichiers nouveaux ou modifiés
+    sont alors re-parsés.
+    manifest : CorpusManifest déjà construit (sinon un parcours unique de base_dir).
+    archive_path : lit les textes depuis une archive (voir corpus_archive)
+    au lieu de parcourir base_dir ; les autres options sont alors ignorées.
+    """
+    if archive_path is not None:
+        yield from iter_archive_documents(archive_path)
+        return
+
+    backend = resolve_backend(backend)
+    if manifest is None:
+        manifest = CorpusManifest.build(base_dir)
+    pool = Pool(processes=n_workers) if n_workers != 1 else None
+
+    try:
+        # Les sous-dossiers immédiats sont considérés comme des codes de langue
+        for lang in manifest.langs:
+            # Tous les .html de tous les sous-dossiers de la langue
+            filepaths = manifest.paths(lang=lang)
+
+            cached = {}
+            to_extract = filepaths
+            if cache is not None:
+                to_extract = []
+                for path in filepaths:
+                    text = cache.get(path, backend)
+                    if text is None:
+                        to_extract.append(path)
+                    else:
+                        cached[path] = text
+
+            if pool is None:
+                extracted = (extract_path_and_text(path, backend) for path in to_extract)
+            else:
+                extracted = extract_texts_parallel(pool, to_extract, chunksize, ordered, backend)
+
+            if cache is not None:
+                extracted = merge_with_cache(filepaths, cached, extracted, ordered)
+
+            n_texts = 0
+            for path, text in extracted:
+                if cache is not None and path not in cached:
+                    cache.put(path, text)
+                if text:
+                    n_texts += 1
+                    yield lang, os.path.relpath(path, base_dir), text
+
+            if n_texts:
+                print(f"[INFO] {lang} : {n_texts} fichiers chargés.")
+            else:
+                print(f"[WARN] Aucun texte valide pour la langue : {lang}")
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+
+def load_corpus_by_language(base_dir, n_workers=1, chunksize=16, ordered=True,
+                            backend=DEFAULT_BACKEND, cache=None, manifest=None,
+                            archive_path=None):
     """
     Charge tous les fichiers HTML pour chaque langue dans base_dir/langue/**.html
     Regroupe les textes par langue dans un dictionnaire {langue: [texte1, texte2, ...]}
+    (options : voir iter_corpus_documents).
     """
     corpus = {}
+    documents = iter_corpus_documents(base_dir, n_workers, chunksize, ordered, backend,
+                                      cache, manifest, archive_path)
 
-    # Les sous-dossiers immédiats sont considérés comme des codes de langue
-    for lang in os.listdir(base_dir):
-        lang_path = os.path.join(base_dir, lang)
-        if not os.path.isdir(lang_path):
-            continue
-
-        # Cherche tous les .html dans tous les sous-dossiers
-        pattern = os.path.join(lang_path, "**", "*.html")
-        filepaths = glob.glob(pattern, recursive=True)
-
-        texts = []
-        for path in filepaths:
-            text = extract_text_from_html(path)
-            if text:
-                texts.append(text)
-
-        if texts:
-            corpus[lang] = texts
-            print(f"[INFO] {lang} : {len(texts)} fichiers chargés.")
-        else:
-            print(f"[WARN] Aucun texte valide pour la langue : {lang}")
+    for lang, _, text in documents:
+        corpus.setdefault(lang, []).append(text)
 
     return corpus
 
@@ -50,6 +139,15 @@ def save_corpus_to_json(corpus_dict, output_path):
         json.dump(corpus_dict, f, ensure_ascii=False, indent=2)
     print(f"[OK] Corpus sauvegardé dans : {output_path}")
 
+def save_corpus_to_jsonl(documents, output_path):
+    """
+    Écrit les documents (langue, chemin, texte) au format JSONL,
+    au fur et à mesure de leur extraction.
+    """
+    records = ({"lang": lang, "path": path, "text": text} for lang, path, text in documents)
+    n_docs = write_jsonl(records, output_path)
+    print(f"[OK] Corpus sauvegardé dans : {output_path} ({n_docs} documents)")
+
 # Exemple d'utilisation
 if __name__ == "__main__":
     BASE_DIR = "../../corpus-multi"
@@ -0,0 +1,59 @@
+import json
+
+# Format JSONL : un document par ligne, ex.
+# {"lang": "fr", "path": "fr/appr/xxx.html", "text": "..."}
+# {"lang": "fr", "path": "fr/appr/xxx.html", "lemmes": [...], "n_tokens": 42, ...}
+
+def is_jsonl(path):
+    return path.endswith(".jsonl")
+
+def write_jsonl(records, output_path):
+    """
+    Écrit les enregistrements (dicts) un par ligne, au fil de l'eau.
+    records peut être un générateur : rien n'est gardé en mémoire.
+    Retourne le nombre d'enregistrements écrits.
+    """
+    n_records = 0
+    with open(output_path, "w", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False))
+            f.write("\n")
+            n_records += 1
+    return n_records
+
+def iter_jsonl(input_path, lang=None):
+    """
+    Relit un fichier JSONL document par document.
+    Si lang est donné, ne renvoie que les documents de cette langue.
+    """
+    with open(input_path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            if lang is None or record.get("lang") == lang:
+                yield record
+
+def index_jsonl_by_lang(input_path):
+    """
+    Positions (en octets) des lignes de chaque langue, dans l'ordre d'apparition :
+    {langue: [offsets]}. Seuls ces entiers sont gardés en mémoire.
+    """
+    offsets_by_lang = {}
+    offset = 0
+    with open(input_path, "rb") as f:
+        for line in f:
+            if line.strip():
+                offsets_by_lang.setdefault(json.loads(line).get("lang"), []).append(offset)
+            offset += len(line)
+    return offsets_by_lang
+
+def iter_jsonl_at(input_path, offsets):
+    """
+    Relit les enregistrements situés aux positions données (voir index_jsonl_by_lang).
+    """
+    with open(input_path, "rb") as f:
+        for offset in offsets:
+            f.seek(offset)
+            yield json.loads(f.readline())
@@ -0,0 +1,146 @@
+import numpy as np
+
+# Stockage en colonnes des lemmes du corpus traité (fichier .npz) :
+# pour chaque langue, une table de vocabulaire (lemmes sans POS) et, pour
+# l'ensemble des documents, un tableau int32 d'identifiants de lemmes,
+# un tableau uint8 de codes POS et les bornes de chaque document.
+# Les chaînes "lemme_POS" ne sont reconstruites qu'à la demande.
+LEMMA_STORE_SUFFIX = ".lemmes.npz"
+
+def lemma_store_path(processed_path):
+    """
+    ex : processed_multilang.json -> processed_multilang.lemmes.npz
+    """
+    return processed_path.rsplit(".", 1)[0] + LEMMA_STORE_SUFFIX
+
+def pack_strings(strings):
+    """
+    Liste de chaînes -> (octets UTF-8 concaténés, offsets de début/fin).
+    """
+    encoded = [s.encode("utf-8") for s in strings]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(b) for b in encoded])
+    return np.frombuffer(b"".join(encoded), dtype=np.uint8), offsets
+
+def unpack_strings(blob, offsets):
+    data = blob.tobytes()
+    return [data[offsets[i]:offsets[i + 1]].decode("utf-8") for i in range(len(offsets) - 1)]
+
+class LemmaStoreWriter:
+    """
+    Construit le stockage document par document (add), puis l'écrit (save).
+    Accepte les listes "lemme_POS" produites par analyze_doc.
+    """
+
+    def __init__(self):
+        self.pos_codes = {}
+        self.langs = {}
+
+    def add(self, lang, lemmes):
+        table = self.langs.setdefault(lang, {"vocab": {}, "ids": [], "pos": [], "lengths": []})
+        vocab = table["vocab"]
+
+        ids = np.empty(len(lemmes), dtype=np.int32)
+        pos = np.empty(len(lemmes), dtype=np.uint8)
+        for i, lemme in enumerate(lemmes):
+            lemma, _, tag = lemme.rpartition("_")
+            ids[i] = vocab.setdefault(lemma, len(vocab))
+            pos[i] = self.pos_codes.setdefault(tag, len(self.pos_codes))
+
+        table["ids"].append(ids)
+        table["pos"].append(pos)
+        table["lengths"].append(len(lemmes))
+
+    def save(self, output_path):
+        pos_blob, pos_offsets = pack_strings(list(self.pos_codes))
+        arrays = {"pos_blob": pos_blob, "pos_offsets": pos_offsets}
+
+        for lang, table in self.langs.items():
+            vocab_blob, vocab_offsets = pack_strings(list(table["vocab"]))
+            doc_offsets = np.zeros(len(table["lengths"]) + 1, dtype=np.int64)
+            doc_offsets[1:] = np.cumsum(table["lengths"])
+
+            arrays[f"{lang}.vocab_blob"] = vocab_blob
+            arrays[f"{lang}.vocab_offsets"] = vocab_offsets
+            arrays[f"{lang}.ids"] = np.concatenate(table["ids"] or [np.empty(0, dtype=np.int32)])
+            arrays[f"{lang}.pos"] = np.concatenate(table["pos"] or [np.empty(0, dtype=np.uint8)])
+            arrays[f"{lang}.doc_offsets"] = doc_offsets
+
+        np.savez(output_path, **arrays)
+        print(f"[OK] Lemmes en colonnes sauvegardés dans : {output_path}")
+
+def save_lemma_store(processed, output_path):
+    """
+    {langue: [docs analyze_doc]} -> fichier .npz.
+    """
+    writer = LemmaStoreWriter()
+    for lang, docs in processed.items():
+        for doc in docs:
+            writer.add(lang, doc.get("lemmes", []))
+    writer.save(output_path)
+
+def iter_with_lemma_store(records, output_path):
+    """
+    Laisse passer des enregistrements {lang, lemmes, ...} (ex : iter_processed_records)
+    en remplissant le stockage au passage ; le fichier est écrit en fin de flux.
+    """
+    writer = LemmaStoreWriter()
+    for record in records:
+        writer.add(record["lang"], record.get("lemmes", []))
+        yield record
+    writer.save(output_path)
+
+class LemmaStore:
+    """
+    Lecture du stockage : les tableaux d'une langue sont chargés à la première demande.
+    """
+
+    def __init__(self, path):
+        self.npz = np.load(path)
+        self.pos_tags = unpack_strings(self.npz["pos_blob"], self.npz["pos_offsets"])
+        self.langs = sorted({key.split(".", 1)[0] for key in self.npz.files if "." in key})
+        self.tables = {}
+
+    def table(self, lang):
+        if lang not in self.tables:
+            self.tables[lang] = {name: self.npz[f"{lang}.{name}"]
+                                 for name in ("vocab_blob", "vocab_offsets", "ids", "pos", "doc_offsets")}
+        return self.tables[lang]
+
+    def vocab(self, lang):
+        table = self.table(lang)
+        if "vocab" not in table:
+            table["vocab"] = unpack_strings(table["vocab_blob"], table["vocab_offsets"])
+        return table["vocab"]
+
+    def n_docs(self, lang):
+        return len(self.table(lang)["doc_offsets"]) - 1
+
+    def doc_arrays(self, lang, i):
+        """
+        (ids int32, codes POS uint8) du document i, sans conversion en chaînes.
+        """
+        table = self.table(lang)
+        start, end = table["doc_offsets"][i], table["doc_offsets"][i + 1]
+        return table["ids"][start:end], table["pos"][start:end]
+
+    def doc_lemmes(self, lang, i):
+        """
+        Liste "lemme_POS" du document i, comme dans analyze_doc.
+        """
+        vocab = self.vocab(lang)
+        ids, pos = self.doc_arrays(lang, i)
+        return [f"{vocab[w]}_{self.pos_tags[p]}" for w, p in zip(ids.tolist(), pos.tolist())]
+
+    def unique_lemmes(self, lang):
+        """
+        Ensemble des "lemme_POS" distincts de la langue : seuls les couples
+        (lemme, POS) uniques sont convertis en chaînes.
+        """
+        table = self.table(lang)
+        if len(table["ids"]) == 0:
+            return set()
+        pairs = np.unique(table["ids"].astype(np.int64) * len(self.pos_tags) + table["pos"])
+        vocab = self.vocab(lang)
+        n_tags = len(self.pos_tags)
+        return {f"{vocab[pair // n_tags]}_{self.pos_tags[pair % n_tags]}" for pair in pairs.tolist()}
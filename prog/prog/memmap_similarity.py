@@ -0,0 +1,232 @@
+import os
+import shutil
+import numpy as np
+from numpy.lib.format import open_memmap
+from sklearn.utils import check_random_state
+
+# Mode hors mémoire : la matrice de similarité (et les messages d'AffinityPropagation)
+# sont des fichiers .npy ouverts par memmap et parcourus par blocs de lignes.
+# Utilisé automatiquement quand l'estimation en N² dépasse la mémoire disponible.
+MEMORY_FRACTION = 0.7  # part de la mémoire disponible qu'on s'autorise à utiliser
+# Octets par paire au pic de compute_similarity + run_affinity_propagation (mesurés
+# avec tracemalloc) : en float64, matrice, copie d'AffinityPropagation, responsabilités,
+# disponibilités, tableau de travail et bruit ajouté ; en float32 (memory_mb), la
+# matrice est modifiée sur place, sans copie.
+CLUSTERING_BYTES_PER_PAIR = {np.dtype(np.float32): 40, np.dtype(np.float64): 56}
+
+def available_memory_mb():
+    """
+    Mémoire disponible (Linux : MemAvailable de /proc/meminfo), ou None.
+    """
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) / 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+def estimate_clustering_mb(n, dtype=np.float64):
+    """
+    Pic mémoire du clustering en mémoire pour n points, selon le type de la
+    matrice de similarité : float64 pour la matrice dense par défaut, float32
+    quand elle est calculée par blocs (memory_mb). Voir CLUSTERING_BYTES_PER_PAIR.
+    """
+    return n * n * CLUSTERING_BYTES_PER_PAIR[np.dtype(dtype)] / (1024 * 1024)
+
+def estimate_disk_mb(n):
+    """
+    Fichiers du mode hors mémoire pour n points : similarités float32,
+    responsabilités et disponibilités float64.
+    """
+    return n * n * (4 + 2 * 8) / (1024 * 1024)
+
+def check_disk_space(n, work_dir):
+    """
+    Lève OSError si work_dir n'a pas la place pour les fichiers du mode hors mémoire.
+    """
+    free_mb = shutil.disk_usage(work_dir).free / (1024 * 1024)
+    needed_mb = estimate_disk_mb(n)
+    if needed_mb > free_mb:
+        raise OSError(f"Espace disque insuffisant dans {work_dir} pour le mode hors mémoire : "
+                      f"~{needed_mb:.0f} Mo nécessaires, {free_mb:.0f} Mo libres")
+
+def needs_out_of_core(n, memory_fraction=MEMORY_FRACTION, dtype=np.float64):
+    available = available_memory_mb()
+    if available is None:
+        return False
+    return estimate_clustering_mb(n, dtype) > available * memory_fraction
+
+def iter_blocks(n, block_rows):
+    for start in range(0, n, block_rows):
+        yield start, min(start + block_rows, n)
+
+def in_bin(block, lo, hi, closed):
+    return (block >= lo) & ((block <= hi) if closed else (block < hi))
+
+def order_statistic(S, rank, block_rows, n_bins=65536, max_candidates=1_000_000):
+    """
+    Valeur de rang donné (0 = plus petite) parmi tous les éléments de S,
+    sans charger S : histogrammes successifs sur un intervalle de plus en plus
+    étroit, jusqu'à isoler une seule valeur ou au plus max_candidates valeurs.
+    """
+    n = S.shape[0]
+    blocks = list(iter_blocks(n, block_rows))
+    lo = min(float(S[start:end].min()) for start, end in blocks)
+    hi = max(float(S[start:end].max()) for start, end in blocks)
+    below = 0  # nombre d'éléments strictement sous l'intervalle [lo, hi]
+
+    while lo < hi:
+        edges = np.linspace(lo, hi, n_bins + 1)
+        counts = np.zeros(n_bins, dtype=np.int64)
+        for start, end in blocks:
+            block = S[start:end]
+            counts += np.histogram(block[in_bin(block, lo, hi, True)], bins=edges)[0]
+
+        cumulative = np.cumsum(counts)
+        b = int(np.searchsorted(cumulative, rank - below, side="right"))
+        if b > 0:
+            below += int(cumulative[b - 1])
+        bin_lo, bin_hi, closed = edges[b], edges[b + 1], b == n_bins - 1
+
+        values = [S[start:end][in_bin(S[start:end], bin_lo, bin_hi, closed)] for start, end in blocks] \
+            if counts[b] <= max_candidates else None
+        if values is not None:
+            return np.sort(np.concatenate(values))[rank - below]
+
+        # Trop de candidats : on recommence sur les valeurs extrêmes présentes dans ce bac
+        lo, hi = np.inf, -np.inf
+        for start, end in blocks:
+            inside = S[start:end][in_bin(S[start:end], bin_lo, bin_hi, closed)]
+            if inside.size:
+                lo, hi = min(lo, float(inside.min())), max(hi, float(inside.max()))
+
+    return S.dtype.type(lo)
+
+def blocked_median(S, block_rows):
+    """
+    Médiane de tous les éléments de S (comme np.median), par blocs de lignes.
+    """
+    total = S.shape[0] * S.shape[1]
+    ranks = sorted({(total - 1) // 2, total // 2})
+    values = [order_statistic(S, rank, block_rows) for rank in ranks]
+    return np.mean(np.asarray(values, dtype=S.dtype))
+
+def blocked_affinity_propagation(S, work_dir, block_rows, preference=None, damping=0.5,
+                                 max_iter=200, convergence_iter=15, random_state=None):
+    """
+    AffinityPropagation (mêmes mises à jour que sklearn) sur une matrice S
+    carrée ouverte par memmap, modifiée sur place (préférence, bruit).
+    Responsabilités et disponibilités sont aussi des fichiers memmap de work_dir ;
+    seuls des vecteurs de taille N et un bloc de lignes sont en mémoire.
+    Retourne (labels, cluster_centers_indices).
+    """
+    n = S.shape[0]
+    if preference is None:
+        preference = blocked_median(S, block_rows)
+    random_state = check_random_state(random_state)
+
+    paths = [os.path.join(work_dir, name) for name in ("ap_responsibilities.npy", "ap_availabilities.npy")]
+    try:
+        R = open_memmap(paths[0], mode="w+", dtype=np.float64, shape=(n, n))
+        A = open_memmap(paths[1], mode="w+", dtype=np.float64, shape=(n, n))
+
+        # Préférence sur la diagonale et bruit anti-dégénérescence, tirés dans le même ordre que sklearn
+        for start, end in iter_blocks(n, block_rows):
+            rows = np.arange(end - start)
+            block = S[start:end]
+            block[rows, rows + start] = preference
+            block += (np.finfo(S.dtype).eps * block + np.finfo(S.dtype).tiny * 100) * \
+                random_state.standard_normal(size=(end - start, n))
+
+        e = np.zeros((n, convergence_iter))
+        diag_A = np.zeros(n)
+        diag_R = np.zeros(n)
+
+        for it in range(max_iter):
+            # Responsabilités (par lignes), puis somme par colonne des responsabilités positives
+            col_sums = np.zeros(n)
+            for start, end in iter_blocks(n, block_rows):
+                rows = np.arange(end - start)
+                S_block = S[start:end]
+                tmp = A[start:end] + S_block
+                I = np.argmax(tmp, axis=1)
+                Y = tmp[rows, I]
+                tmp[rows, I] = -np.inf
+                Y2 = np.max(tmp, axis=1)
+
+                np.subtract(S_block, Y[:, None], tmp)
+                tmp[rows, I] = S_block[rows, I] - Y2
+                tmp *= 1 - damping
+                R_block = R[start:end]
+                R_block *= damping
+                R_block += tmp
+
+                np.maximum(R_block, 0, out=tmp)
+                tmp[rows, rows + start] = R_block[rows, rows + start]
+                col_sums += tmp.sum(axis=0)
+
+            # Disponibilités (par lignes)
+            for start, end in iter_blocks(n, block_rows):
+                rows = np.arange(end - start)
+                R_block = R[start:end]
+                tmp = np.maximum(R_block, 0)
+                tmp[rows, rows + start] = R_block[rows, rows + start]
+                tmp -= col_sums
+                dA = tmp[rows, rows + start].copy()
+                tmp.clip(0, np.inf, tmp)
+                tmp[rows, rows + start] = dA
+                tmp *= 1 - damping
+                A_block = A[start:end]
+                A_block *= damping
+                A_block -= tmp
+
+                diag_A[start:end] = A_block[rows, rows + start]
+                diag_R[start:end] = R_block[rows, rows + start]
+
+            E = (diag_A + diag_R) > 0
+            e[:, it % convergence_iter] = E
+            K = np.sum(E, axis=0)
+            if it >= convergence_iter:
+                se = np.sum(e, axis=1)
+                unconverged = np.sum((se == convergence_iter) + (se == 0)) != n
+                if not unconverged and K > 0:
+                    break
+        else:
+            print(f"[WARN] AffinityPropagation hors mémoire : pas de convergence en {max_iter} itérations")
+    finally:
+        # Fichiers de messages (N² x 16 octets) supprimés même après une interruption
+        R = A = None
+        for path in paths:
+            if os.path.exists(path):
+                os.remove(path)
+
+    I = np.flatnonzero(E)
+    if I.size == 0:
+        return np.full(n, -1), np.array([], dtype=int)
+
+    c = exemplar_choice(S, I, block_rows)
+    # Affinage : dans chaque cluster, l'exemplaire devient le point le plus similaire aux autres
+    for k in range(I.size):
+        members = np.flatnonzero(c == k)
+        within = np.zeros(members.size)
+        for start in range(0, members.size, block_rows):
+            within += S[members[start:start + block_rows]][:, members].sum(axis=0)
+        I[k] = members[np.argmax(within)]
+
+    c = exemplar_choice(S, I, block_rows)
+    labels = I[c]
+    centers = np.unique(labels)
+    return np.searchsorted(centers, labels), centers
+
+def exemplar_choice(S, I, block_rows):
+    """
+    Indice (dans I) de l'exemplaire le plus similaire à chaque point ;
+    chaque exemplaire se choisit lui-même.
+    """
+    c = np.empty(S.shape[0], dtype=np.intp)
+    for start, end in iter_blocks(S.shape[0], block_rows):
+        c[start:end] = np.argmax(S[start:end][:, I], axis=1)
+    c[I] = np.arange(I.size)
+    return c
@@ -0,0 +1,181 @@
+import time
+import numpy as np
+from scipy import sparse
+from sklearn.preprocessing import normalize
+from block_similarity import blockwise_similarity, condensed_offset, DEFAULT_MEMORY_MB
+
+# Paires candidates par MinHash/LSH : chaque token est réduit à la signature
+# MinHash de son ensemble de n-grammes (colonnes non nulles de X), découpée en
+# bandes ; deux tokens qui partagent une bande entière deviennent candidats.
+# Le cosinus exact n'est ensuite calculé que sur ces paires, au lieu de N².
+# MinHash estime le Jaccard des ensembles de n-grammes, plus bas que le cosinus
+# des comptes : pour deux ensembles de taille voisine, J ≈ cos / (2 - cos), soit
+# J ≈ 0.33 pour cos = 0.5. 32 bandes de 2 lignes retiennent une paire de Jaccard s
+# avec la probabilité 1 - (1 - s^2)^32 (≈ 0.98 à s = 0.33, ≈ 0.63 à s = 0.18, cos 0.3).
+DEFAULT_NUM_PERM = 64
+DEFAULT_BANDS = 32
+MERSENNE_PRIME = (1 << 31) - 1
+BAND_HASH_MULTIPLIER = np.uint64(0x9E3779B97F4A7C15)
+HASH_CHUNK_MB = 64  # taille visée des tableaux de hachage intermédiaires
+PAIR_CHUNK = 500000  # paires traitées à la fois pour le cosinus exact
+SAMPLE_PAIRS = 100000  # paires tirées pour estimer la médiane de la matrice complète
+
+def minhash_signatures(X, num_perm=DEFAULT_NUM_PERM, random_state=42):
+    """
+    Signatures MinHash (N x num_perm, int64) des ensembles de colonnes non
+    nulles de chaque ligne de X, avec des hachages h(x) = (a*x + b) mod p.
+    Une ligne vide garde la valeur p (jamais candidate, voir lsh_candidate_pairs).
+    """
+    X = sparse.csr_matrix(X)
+    X.sort_indices()
+    n = X.shape[0]
+    rng = np.random.RandomState(random_state)
+    a = rng.randint(1, MERSENNE_PRIME, size=num_perm).astype(np.int64)
+    b = rng.randint(0, MERSENNE_PRIME, size=num_perm).astype(np.int64)
+
+    signatures = np.full((n, num_perm), MERSENNE_PRIME, dtype=np.int64)
+    nonempty = np.flatnonzero(np.diff(X.indptr))
+    if nonempty.size == 0:
+        return signatures
+
+    columns = X.indices.astype(np.int64)
+    starts = X.indptr[nonempty]
+    chunk = max(1, int(HASH_CHUNK_MB * 1024 * 1024 // (8 * max(len(columns), 1))))
+    for start in range(0, num_perm, chunk):
+        end = min(start + chunk, num_perm)
+        hashed = (columns[:, None] * a[start:end] + b[start:end]) % MERSENNE_PRIME
+        signatures[nonempty, start:end] = np.minimum.reduceat(hashed, starts, axis=0)
+    return signatures
+
+def band_buckets(band):
+    """
+    Clé de seau (uint64) de chaque ligne : lignes identiques sur la bande = même clé.
+    Hachage polynomial modulo 2**64 : une collision ajoute au pire des candidats,
+    que le cosinus exact départage.
+    """
+    keys = np.zeros(len(band), dtype=np.uint64)
+    for column in band.T.astype(np.uint64):
+        keys = keys * BAND_HASH_MULTIPLIER + column
+    return keys
+
+def bucket_pairs(buckets, rows, n):
+    """
+    Toutes les paires (codées i * n + j, i < j) de lignes partageant un seau.
+    Un seau de taille m donne m(m-1)/2 paires.
+    """
+    order = np.argsort(buckets, kind="stable")
+    sorted_buckets, sorted_rows = buckets[order], rows[order]
+    starts = np.flatnonzero(np.r_[True, sorted_buckets[1:] != sorted_buckets[:-1]])
+    sizes = np.diff(np.r_[starts, len(buckets)])
+
+    # Position p d'un seau de taille m : appariée aux m - (rang de p) - 1 positions suivantes
+    positions = np.arange(len(buckets))
+    followers = np.repeat(starts + sizes, sizes) - positions - 1
+    if not followers.any():
+        return []
+    first = np.repeat(positions, followers)
+    offsets = np.cumsum(followers) - followers
+    second = np.arange(len(first)) - np.repeat(offsets, followers) + first + 1
+
+    i, j = sorted_rows[first], sorted_rows[second]
+    return [np.minimum(i, j) * n + np.maximum(i, j)]
+
+def lsh_candidate_pairs(signatures, bands=DEFAULT_BANDS):
+    """
+    Paires candidates (i, j), i < j, triées et sans doublon : au moins une
+    bande de la signature identique. Retourne deux tableaux (i, j).
+    """
+    n, num_perm = signatures.shape
+    if num_perm % bands:
+        raise ValueError(f"num_perm ({num_perm}) doit être un multiple de bands ({bands})")
+    rows_per_band = num_perm // bands
+    rows = np.flatnonzero(signatures[:, 0] != MERSENNE_PRIME)
+
+    codes = []
+    for band in range(bands):
+        values = signatures[rows, band * rows_per_band:(band + 1) * rows_per_band]
+        codes.extend(bucket_pairs(band_buckets(values), rows, n))
+
+    if not codes:
+        empty = np.array([], dtype=np.int64)
+        return empty, empty
+    # Tri + comparaison aux voisins : bien plus rapide que np.unique sur des dizaines de millions de codes
+    codes = np.concatenate(codes)
+    codes.sort()
+    codes = codes[np.r_[True, codes[1:] != codes[:-1]]]
+    return codes // n, codes % n
+
+def pair_cosine(X, i, j):
+    """
+    Cosinus exact des lignes i[k] et j[k] de X (float32), par paquets de paires.
+    """
+    Xn = normalize(sparse.csr_matrix(X, dtype=np.float32))
+    values = np.empty(len(i), dtype=np.float32)
+    for start in range(0, len(i), PAIR_CHUNK):
+        end = min(start + PAIR_CHUNK, len(i))
+        values[start:end] = np.asarray(Xn[i[start:end]].multiply(Xn[j[start:end]]).sum(axis=1)).ravel()
+    return np.clip(values, 0.0, 1.0)
+
+def minhash_similarity(X, num_perm=DEFAULT_NUM_PERM, bands=DEFAULT_BANDS, min_similarity=0.0,
+                       random_state=42):
+    """
+    Matrice CSR symétrique (N x N, float32) des similarités cosinus exactes des
+    seules paires candidates LSH de similarité > min_similarity (sans diagonale),
+    à passer à sparse_affinity_propagation comme le graphe de knn_similarity.
+    Plus de bandes (moins de lignes par bande) : plus de candidats et meilleur rappel.
+    """
+    n = X.shape[0]
+    i, j = lsh_candidate_pairs(minhash_signatures(X, num_perm, random_state), bands)
+    values = pair_cosine(X, i, j)
+    keep = values > min_similarity
+    i, j, values = i[keep], j[keep], values[keep]
+
+    similarity = sparse.csr_matrix((np.concatenate([values, values]),
+                                    (np.concatenate([i, j]), np.concatenate([j, i]))),
+                                   shape=(n, n), dtype=np.float32)
+    similarity.sort_indices()
+    return similarity
+
+def sampled_median(X, n_pairs=SAMPLE_PAIRS, random_state=42):
+    """
+    Médiane du cosinus sur des paires tirées au hasard : estimation de la médiane
+    de la matrice complète, c'est-à-dire de la préférence du mode dense. Les
+    arêtes LSH étant les paires les plus similaires, leur médiane serait bien plus haute.
+    """
+    rng = np.random.RandomState(random_state)
+    n = X.shape[0]
+    return float(np.median(pair_cosine(X, rng.randint(0, n, n_pairs), rng.randint(0, n, n_pairs))))
+
+def lsh_recall_report(X, configs=((64, 16), (64, 32), (128, 64)), thresholds=(0.3, 0.5, 0.7, 0.9),
+                      memory_mb=DEFAULT_MEMORY_MB, random_state=42):
+    """
+    Compare la matrice exacte (toutes les paires, par blocs) aux candidats LSH
+    pour chaque configuration (num_perm, bands) : temps, nombre de paires
+    candidates et rappel des paires exactes de cosinus >= chaque seuil.
+    Retourne une liste de dictionnaires (une entrée par configuration).
+    """
+    n = X.shape[0]
+    start = time.perf_counter()
+    exact = blockwise_similarity(X, memory_mb, condensed=True, report=False)
+    exact_time = time.perf_counter() - start
+    print(f"[PERF] Exact : {n} tokens, {len(exact)} paires en {exact_time:.2f} s")
+
+    expected = {t: np.flatnonzero(exact >= t) for t in thresholds}
+    report = []
+    for num_perm, bands in configs:
+        start = time.perf_counter()
+        i, j = lsh_candidate_pairs(minhash_signatures(X, num_perm, random_state), bands)
+        pair_cosine(X, i, j)
+        lsh_time = time.perf_counter() - start
+
+        found = condensed_offset(i, n) + (j - i - 1)
+        recall = {t: float(np.isin(pairs, found).mean()) if len(pairs) else 1.0
+                  for t, pairs in expected.items()}
+        report.append({"num_perm": num_perm, "bands": bands, "n_candidates": int(len(i)),
+                       "time": lsh_time, "exact_time": exact_time, "recall": recall})
+
+        recall_str = " ".join(f"≥{t}:{r:.1%}" for t, r in recall.items())
+        print(f"[PERF] LSH {num_perm} perm / {bands} bandes : {len(i)} candidats "
+              f"({len(i) / max(len(exact), 1):.2%} des paires) en {lsh_time:.2f} s "
+              f"(x{exact_time / max(lsh_time, 1e-9):.1f}) | rappel {recall_str}")
+    return report
@@ -0,0 +1,64 @@
+import gc
+import os
+import time
+from collections import OrderedDict
+
+def current_rss_mb():
+    """
+    Mémoire résidente actuelle du processus (Linux : /proc/self/statm), ou None.
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            resident_pages = int(f.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return resident_pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+
+class ModelPool:
+    """
+    Pool de modèles spaCy chargés à la première utilisation.
+    Au-delà de max_models modèles (ou de max_rss_mb de mémoire résidente),
+    les modèles les moins récemment utilisés sont libérés.
+    loader(key) charge le modèle correspondant à une clé (ex : (langue, profil)).
+    """
+
+    def __init__(self, loader, max_models=3, max_rss_mb=None):
+        self.loader = loader
+        self.max_models = max_models
+        self.max_rss_mb = max_rss_mb
+        self.models = OrderedDict()
+        self.load_times = {}
+
+    def get(self, key):
+        if key in self.models:
+            self.models.move_to_end(key)
+            return self.models[key]
+
+        start = time.perf_counter()
+        nlp = self.loader(key)
+        self.load_times[key] = time.perf_counter() - start
+        print(f"[MODEL] {key} chargé en {self.load_times[key]:.1f} s")
+
+        self.models[key] = nlp
+        self.evict()
+        return nlp
+
+    def over_budget(self):
+        if len(self.models) > self.max_models:
+            return True
+        if self.max_rss_mb is not None and len(self.models) > 1:
+            rss = current_rss_mb()
+            return rss is not None and rss > self.max_rss_mb
+        return False
+
+    def evict(self):
+        # Le modèle le plus récent (celui qu'on vient de demander) n'est jamais libéré
+        while self.over_budget():
+            key, _ = self.models.popitem(last=False)
+            gc.collect()
+            print(f"[MODEL] {key} libéré (LRU)")
+
+    def print_stats(self):
+        for key, seconds in self.load_times.items():
+            status = "chargé" if key in self.models else "libéré"
+            print(f"  {str(key):<30} → {seconds:.1f} s ({status})")
@@ -1,60 +1,193 @@
 import os
-from html_loader import load_corpus_by_language, save_corpus_to_json
-from spacy_processor_multilang import process_texts_by_lang, save_processed_data
-from cluster_multilang import cluster_all_languages
+from html_loader import load_corpus_by_language, save_corpus_to_json, iter_corpus_documents, save_corpus_to_jsonl
+from spacy_processor_multilang import process_texts_by_lang, save_processed_data, iter_processed_records, save_processed_jsonl
+from spacy_processor_multilang import get_nlp, model_pool, ANALYZE_PROFILE
+from spacy_processor_multilang import compute_stats_by_lang, iter_fast_stats_records
+from annotation_cache import AnnotationCache
+from cluster_multilang import cluster_all_ranges
 from visualize_stats import main as plot_stats_main
 from visualize_clusters import visualize_all_clusters
+from jsonl_io import iter_jsonl
+from extraction_cache import ExtractionCache
+from corpus_manifest import CorpusManifest
+from boilerplate import strip_boilerplate_by_lang, iter_stripped_records
+from lemma_store import lemma_store_path, save_lemma_store, iter_with_lemma_store
 
-def run_full_pipeline(base_dir, output_dir):
+def run_full_pipeline(base_dir, output_dir, n_workers=1, use_jsonl=False, use_cache=True,
+                      boilerplate_fraction=None, archive_path=None,
+                      spacy_batch_size=32, spacy_n_process=1, max_chunk_chars=None,
+                      stats_mode="full", similarity_top_k=None, similarity_memory_mb=None,
+                      similarity_out_of_core=None, ngram_n_features=None, similarity_lsh_bands=None):
+    """
+    use_jsonl : si True, les étapes 1 et 2 écrivent/relisent des fichiers JSONL
+    (un document par ligne) et traitent le corpus en flux, sans le charger en entier.
+    use_cache : réutilise les textes déjà extraits des fichiers HTML inchangés
+    (output_dir/extraction_cache.jsonl) et les annotations spaCy des textes
+    déjà traités avec le même modèle (output_dir/annotation_cache/).
+    boilerplate_fraction : si donné, les blocs de texte présents dans plus de
+    cette proportion des documents d'une langue sont retirés avant spaCy.
+    archive_path : lit les textes depuis une archive corpus_archive au lieu
+    de parcourir base_dir (pas de manifeste ni de cache dans ce cas).
+    spacy_batch_size / spacy_n_process : paramètres de nlp.pipe à l'étape 2.
+    max_chunk_chars : découpe les textes plus longs en morceaux annotés en parallèle
+    (désactivé par défaut : près des coupures, POS et entités peuvent différer du texte entier).
+    stats_mode : "full" (pipeline complet), "fast" (tokenizer seul : n_tokens, n_types)
+    ou "fast_pos" (ajoute les proportions POS, sans NER). Les modes rapides
+    ne font que les statistiques (étape 5) : pas de lemmes, donc pas de clustering.
+    similarity_top_k : clustering sur le graphe creux des top_k plus proches
+    voisins de chaque lemme au lieu de la matrice de similarité complète.
+    similarity_memory_mb : matrice complète en float32, calculée par blocs
+    sous ce budget mémoire (avec rapport du pic de mémoire).
+    similarity_out_of_core : matrice de similarité sur disque (memmap) ; None =
+    automatique quand elle ne tiendrait pas en mémoire.
+    ngram_n_features : n-grammes hachés sur ce nombre de colonnes (sans vocabulaire,
+    mémoire fixe) pour le clustering et la visualisation des clusters.
+    similarity_lsh_bands : clustering sur les seules paires candidates MinHash/LSH
+    (ce nombre de bandes), cosinus exact calculé uniquement pour elles.
+    """
+    if stats_mode not in ("full", "fast", "fast_pos"):
+        raise ValueError(f"stats_mode inconnu : {stats_mode}")
     os.makedirs(output_dir, exist_ok=True)
 
     # Étape 1 : extraction HTML
-    corpus_json = os.path.join(output_dir, "corpus_grouped_by_lang.json")
     print("\n--- Étape 1 : Extraction HTML ---")
-    corpus = load_corpus_by_language(base_dir)
-    save_corpus_to_json(corpus, corpus_json)
+    manifest = None
+    cache = None
+    if archive_path is None:
+        manifest = CorpusManifest.load_or_build(base_dir, os.path.join(output_dir, "corpus_manifest.json"))
+        if use_cache:
+            cache = ExtractionCache(os.path.join(output_dir, "extraction_cache.jsonl"))
+
+    loader_options = {"n_workers": n_workers, "cache": cache, "manifest": manifest,
+                      "archive_path": archive_path}
+    if use_jsonl:
+        corpus_jsonl = os.path.join(output_dir, "corpus_grouped_by_lang.jsonl")
+        documents = iter_corpus_documents(base_dir, **loader_options)
+        save_corpus_to_jsonl(documents, corpus_jsonl)
+    else:
+        corpus_json = os.path.join(output_dir, "corpus_grouped_by_lang.json")
+        corpus = load_corpus_by_language(base_dir, **loader_options)
+        save_corpus_to_json(corpus, corpus_json)
+    if cache is not None:
+        cache.save()
+        cache.print_stats()
+
+    if stats_mode != "full":
+        run_fast_stats(corpus_jsonl if use_jsonl else corpus, output_dir, use_jsonl,
+                       boilerplate_fraction, with_pos=(stats_mode == "fast_pos"))
+        return
 
     # Étape 2 : traitement linguistique
-    processed_json = os.path.join(output_dir, "processed_multilang.json")
     print("\n--- Étape 2 : Lemmatisation + NER + Stats ---")
-    processed = process_texts_by_lang(corpus)
-    save_processed_data(processed, processed_json)
-
-    # Étape 3 : Clustering (n-grammes)
-    print("\n--- Étape 3 : Clustering bigrammes/trigrammes ---")
-    cluster_all_languages(
-        input_path=processed_json,
-        output_path=os.path.join(output_dir, "clusters_ngrams_2_3.json"),
-        ngram_range=(2, 3)
-    )
+    annotations = None
+    if use_cache:
+        annotations = AnnotationCache(os.path.join(output_dir, "annotation_cache"), get_nlp(), ANALYZE_PROFILE,
+                                      max_chunk_chars)
+    if use_jsonl:
+        processed_json = os.path.join(output_dir, "processed_multilang.jsonl")
+        if boilerplate_fraction is not None:
+            records = iter_stripped_records(corpus_jsonl, max_doc_fraction=boilerplate_fraction)
+        else:
+            records = iter_jsonl(corpus_jsonl)
+        processed = iter_processed_records(records, spacy_batch_size, spacy_n_process, annotations,
+                                           max_chunk_chars)
+        lemmes_path = lemma_store_path(processed_json)
+        save_processed_jsonl(iter_with_lemma_store(processed, lemmes_path), processed_json)
+    else:
+        processed_json = os.path.join(output_dir, "processed_multilang.json")
+        if boilerplate_fraction is not None:
+            corpus = strip_boilerplate_by_lang(corpus, max_doc_fraction=boilerplate_fraction)
+        processed = process_texts_by_lang(corpus, spacy_batch_size, spacy_n_process, annotations,
+                                          max_chunk_chars)
+        save_processed_data(processed, processed_json)
+        lemmes_path = lemma_store_path(processed_json)
+        save_lemma_store(processed, lemmes_path)
+    if annotations is not None:
+        annotations.close()
+        annotations.print_stats()
+    model_pool.print_stats()
 
-    print("\n--- Étape 4 : Clustering 4-5-grammes ---")
-    cluster_all_languages(
-        input_path=processed_json,
-        output_path=os.path.join(output_dir, "clusters_ngrams_4_5.json"),
-        ngram_range=(4, 5)
+    # Étapes 3 et 4 : Clustering (n-grammes), lemmes lus et n-grammes extraits une seule fois
+    print("\n--- Étapes 3-4 : Clustering bi/trigrammes et 4-5-grammes ---")
+    cluster_all_ranges(
+        input_path=lemmes_path,
+        outputs={
+            (2, 3): os.path.join(output_dir, "clusters_ngrams_2_3.json"),
+            (4, 5): os.path.join(output_dir, "clusters_ngrams_4_5.json"),
+        },
+        top_k=similarity_top_k,
+        memory_mb=similarity_memory_mb,
+        out_of_core=similarity_out_of_core,
+        n_features=ngram_n_features,
+        lsh_bands=similarity_lsh_bands
     )
 
     # Étape 5 : Visualisation statistiques linguistiques
     print("\n--- Étape 5 : Visualisation statistiques ---")
-    plot_stats_main()
+    plot_stats_main(processed_json)
 
     # Étape 6 : Visualisation des clusters
     print("\n--- Étape 6 : Visualisation des clusters ---")
     visualize_all_clusters(
         json_path=os.path.join(output_dir, "clusters_ngrams_2_3.json"),
-        title_prefix="Clusters lexicaux (bi/tri-grammes)"
+        title_prefix="Clusters lexicaux (bi/tri-grammes)",
+        n_features=ngram_n_features
     )
     visualize_all_clusters(
         json_path=os.path.join(output_dir, "clusters_ngrams_4_5.json"),
-        title_prefix="Clusters lexicaux (4/5-grammes)"
+        title_prefix="Clusters lexicaux (4/5-grammes)",
+        n_features=ngram_n_features
     )
 
     print("\n✅ Pipeline terminé avec succès !")
 
+def run_fast_stats(corpus, output_dir, use_jsonl, boilerplate_fraction, with_pos):
+    """
+    Étapes 2 et 5 en mode rapide : statistiques sans lemmatisation ni NER.
+    corpus : chemin du JSONL de l'étape 1 (use_jsonl) ou dictionnaire {langue: [textes]}.
+    """
+    print("\n--- Étape 2 : Stats rapides (" + ("tokenizer + POS" if with_pos else "tokenizer seul") + ") ---")
+    if use_jsonl:
+        stats_json = os.path.join(output_dir, "stats_multilang.jsonl")
+        if boilerplate_fraction is not None:
+            records = iter_stripped_records(corpus, max_doc_fraction=boilerplate_fraction)
+        else:
+            records = iter_jsonl(corpus)
+        save_processed_jsonl(iter_fast_stats_records(records, with_pos), stats_json)
+    else:
+        stats_json = os.path.join(output_dir, "stats_multilang.json")
+        if boilerplate_fraction is not None:
+            corpus = strip_boilerplate_by_lang(corpus, max_doc_fraction=boilerplate_fraction)
+        save_processed_data(compute_stats_by_lang(corpus, with_pos), stats_json)
+    model_pool.print_stats()
+
+    print("\n--- Étape 5 : Visualisation statistiques ---")
+    plot_stats_main(stats_json)
+
+    print("\n✅ Statistiques rapides terminées !")
+
 # Lancer le pipeline
 if __name__ == "__main__":
     BASE_DIR = "../corpus_multi"
     OUTPUT_DIR = "../pipeline_results"
+    N_WORKERS = None  # None = tous les cœurs, 1 = extraction séquentielle
+    USE_JSONL = False  # True = format JSONL en flux (mémoire bornée)
+    BOILERPLATE_FRACTION = None  # ex : 0.3 = blocs présents dans plus de 30 % des documents retirés
+    ARCHIVE_PATH = None  # ex : "../corpus_multi.pack" (python corpus_archive.py pack ...)
+    SPACY_BATCH_SIZE = 32
+    SPACY_N_PROCESS = 1  # > 1 : nlp.pipe multi-processus
+    MAX_CHUNK_CHARS = None  # ex : 20000 = textes longs découpés (POS/NER peuvent différer près des coupures)
+    SIMILARITY_TOP_K = None  # ex : 30 = graphe creux des 30 plus proches voisins (grands vocabulaires)
+    SIMILARITY_MEMORY_MB = None  # ex : 256 = similarités float32 par blocs de 256 Mo
+    SIMILARITY_OUT_OF_CORE = None  # None = auto, True = toujours sur disque, False = jamais
+    SIMILARITY_LSH_BANDS = None  # ex : 32 = paires candidates MinHash/LSH (voir bench_lsh.py)
+    NGRAM_N_FEATURES = None  # ex : 2**20 = n-grammes hachés (pas de vocabulaire à construire)
+    STATS_MODE = "full"  # "fast" / "fast_pos" : seulement les statistiques, bien plus vite
 
-    run_full_pipeline(BASE_DIR, OUTPUT_DIR)
+    run_full_pipeline(BASE_DIR, OUTPUT_DIR, n_workers=N_WORKERS, use_jsonl=USE_JSONL,
+                      boilerplate_fraction=BOILERPLATE_FRACTION, archive_path=ARCHIVE_PATH,
+                      spacy_batch_size=SPACY_BATCH_SIZE, spacy_n_process=SPACY_N_PROCESS,
+                      max_chunk_chars=MAX_CHUNK_CHARS, stats_mode=STATS_MODE,
+                      similarity_top_k=SIMILARITY_TOP_K, similarity_memory_mb=SIMILARITY_MEMORY_MB,
+                      similarity_out_of_core=SIMILARITY_OUT_OF_CORE, ngram_n_features=NGRAM_N_FEATURES,
+                      similarity_lsh_bands=SIMILARITY_LSH_BANDS)
@@ -1,22 +1,38 @@
-import spacy
 import subprocess
 import sys
 import json
+import time
+import numpy as np
+from jsonl_io import write_jsonl
+from spacy_profiles import load_with_profile
+from annotation_cache import text_hash
+from model_pool import ModelPool
+from chunking import split_into_chunks
+from doc_arrays import doc_columns, hashes_to_strings, lemma_pos_strings, valid_token_mask, is_propn
 
 MODEL_NAME = "xx_ent_wiki_sm"
+# analyze_doc utilise lemmes, POS et entités : pas besoin du parser
+ANALYZE_PROFILE = "lemma_pos_ner"
 
-def load_spacy_model():
+def load_spacy_model(profile=ANALYZE_PROFILE):
     """
-    Charge le modèle multilingue spaCy, ou le télécharge si nécessaire.
+    Charge le modèle multilingue spaCy (composants du profil uniquement),
+    ou le télécharge si nécessaire.
     """
     try:
-        return spacy.load(MODEL_NAME)
+        return load_with_profile(MODEL_NAME, profile)
     except OSError:
         print(f"[INFO] Modèle spaCy '{MODEL_NAME}' non trouvé. Téléchargement...")
         subprocess.run([sys.executable, "-m", "spacy", "download", MODEL_NAME], check=True)
-        return spacy.load(MODEL_NAME)
+        return load_with_profile(MODEL_NAME, profile)
 
-nlp = load_spacy_model()
+# Chargement paresseux : le modèle n'est chargé (ou téléchargé) qu'au premier
+# get_nlp(), une entrée par profil ; au-delà de MAX_MODELS, le moins récent est libéré
+MAX_MODELS = 2
+model_pool = ModelPool(load_spacy_model, max_models=MAX_MODELS)
+
+def get_nlp(profile=ANALYZE_PROFILE):
+    return model_pool.get(profile)
 
 def is_valid_token(token):
     """
@@ -30,12 +46,32 @@ def is_valid_token(token):
         token.text.strip() != ""
     )
 
-def analyze_doc(doc):
+def analyze_partial(doc, offset=0):
     """
-    Analyse un document spaCy pour extraire :
-    - Lemmatisation + POS
-    - Entités nommées
-    - Statistiques : n_tokens, n_types, prop_lemmes, prop_propn
+    Comptages bruts d'un document (ou d'un morceau de document commençant
+    au caractère offset) : lemmes, types, entités avec positions dans le texte entier.
+    Version vectorisée (Doc.to_array + NumPy) de analyze_partial_tokens, même résultat.
+    """
+    columns = doc_columns(doc, ["is_punct", "is_space", "is_quote", "is_currency",
+                                "lower", "lemma", "pos"])
+    valid = valid_token_mask(columns)
+    propn = valid & is_propn(columns["pos"])
+    kept = valid & ~propn
+
+    return {
+        "lemmes": lemma_pos_strings(doc, columns["lemma"][kept], columns["pos"][kept]),
+        "entites": [(ent.start_char + offset, ent.end_char + offset, ent.text, ent.label_)
+                    for ent in doc.ents],
+        "types": set(hashes_to_strings(doc, np.unique(columns["lower"][valid]))),
+        "n_tokens": int(valid.sum()),
+        "n_lemmes": int(kept.sum()),
+        "n_propn": int(propn.sum()),
+        "n_spacy_tokens": len(doc)
+    }
+
+def analyze_partial_tokens(doc, offset=0):
+    """
+    Version token par token de analyze_partial (référence pour bench_doc_arrays).
     """
     lemmes = []
     types_set = set()
@@ -58,38 +94,187 @@ def analyze_doc(doc):
 
     return {
         "lemmes": lemmes,
-        "entites": [(ent.text, ent.label_) for ent in doc.ents],
+        "entites": [(ent.start_char + offset, ent.end_char + offset, ent.text, ent.label_)
+                    for ent in doc.ents],
+        "types": types_set,
+        "n_tokens": n_tokens,
+        "n_lemmes": n_lemmes,
+        "n_propn": n_propn,
+        "n_spacy_tokens": len(doc)
+    }
+
+def merge_partials(partials):
+    """
+    Recolle les comptages des morceaux d'un même document (dans l'ordre).
+    """
+    merged = {"lemmes": [], "entites": [], "types": set(),
+              "n_tokens": 0, "n_lemmes": 0, "n_propn": 0, "n_spacy_tokens": 0}
+
+    for partial in partials:
+        merged["lemmes"].extend(partial["lemmes"])
+        merged["entites"].extend(partial["entites"])
+        merged["types"].update(partial["types"])
+        for key in ("n_tokens", "n_lemmes", "n_propn", "n_spacy_tokens"):
+            merged[key] += partial[key]
+
+    return merged
+
+def finalize_stats(partial):
+    n_tokens = partial["n_tokens"]
+    return {
+        "lemmes": partial["lemmes"],
+        "entites": [(text, label) for _, _, text, label in partial["entites"]],
         "n_tokens": n_tokens,
-        "n_types": len(types_set),
-        "prop_lemmes": round(n_lemmes / n_tokens, 3) if n_tokens else 0.0,
-        "prop_propn": round(n_propn / n_tokens, 3) if n_tokens else 0.0
+        "n_types": len(partial["types"]),
+        "prop_lemmes": round(partial["n_lemmes"] / n_tokens, 3) if n_tokens else 0.0,
+        "prop_propn": round(partial["n_propn"] / n_tokens, 3) if n_tokens else 0.0
     }
 
-def process_texts_by_lang(corpus_by_lang):
+def analyze_doc(doc):
+    """
+    Analyse un document spaCy pour extraire :
+    - Lemmatisation + POS
+    - Entités nommées
+    - Statistiques : n_tokens, n_types, prop_lemmes, prop_propn
+    """
+    return finalize_stats(analyze_partial(doc))
+
+def iter_doc_stats(nlp, pairs, batch_size=32, n_process=1, max_chunk_chars=None):
+    """
+    Annote des couples (texte, contexte) avec nlp.pipe et génère
+    (stats analyze_doc, nombre de tokens spaCy, contexte) dans l'ordre d'entrée.
+
+    max_chunk_chars : si donné, chaque texte est découpé en morceaux (voir
+    chunking.split_into_chunks) annotés indépendamment, donc répartis entre les
+    n_process processus, puis recollés document par document.
+    """
+    if max_chunk_chars is None:
+        for doc, context in nlp.pipe(pairs, as_tuples=True, batch_size=batch_size, n_process=n_process):
+            partial = analyze_partial(doc)
+            yield finalize_stats(partial), partial["n_spacy_tokens"], context
+        return
+
+    def chunk_pairs():
+        for text, context in pairs:
+            chunks = split_into_chunks(text, max_chunk_chars)
+            for offset, chunk in chunks:
+                yield chunk, (offset, len(chunks), context)
+
+    partials = []
+    chunk_docs = nlp.pipe(chunk_pairs(), as_tuples=True, batch_size=batch_size, n_process=n_process)
+    for doc, (offset, n_chunks, context) in chunk_docs:
+        partials.append(analyze_partial(doc, offset))
+        if len(partials) == n_chunks:
+            merged = merge_partials(partials)
+            partials = []
+            yield finalize_stats(merged), merged["n_spacy_tokens"], context
+
+def print_throughput(label, n_docs, n_tokens, elapsed, batch_size, n_process):
+    docs_per_sec = n_docs / elapsed if elapsed else 0.0
+    tokens_per_sec = n_tokens / elapsed if elapsed else 0.0
+    print(f"[PERF] {label} : {docs_per_sec:.1f} docs/s, {tokens_per_sec:.0f} tokens/s "
+          f"(batch_size={batch_size}, n_process={n_process}, {elapsed:.1f} s)")
+
+def process_texts_by_lang(corpus_by_lang, batch_size=32, n_process=1, cache=None,
+                          max_chunk_chars=None):
     """
     Applique spaCy à chaque texte du corpus regroupé par langue.
+    Les textes passent par nlp.pipe (lots de batch_size, n_process processus) ;
+    l'ordre des résultats est celui des textes.
+    cache : AnnotationCache optionnel, seuls les textes inconnus sont annotés.
+    max_chunk_chars : découpe les textes longs (voir iter_doc_stats).
     """
     result = {}
 
     for lang, texts in corpus_by_lang.items():
         print(f"\n[INFO] Traitement langue : {lang} ({len(texts)} textes)")
-        lang_results = []
-        total_lemmes = 0
+        lang_results = [None] * len(texts)
+        total_tokens = 0
+        start = time.perf_counter()
 
-        for i, text in enumerate(texts):
-            doc = nlp(text)
-            stats = analyze_doc(doc)
-            lang_results.append(stats)
-            total_lemmes += len(stats["lemmes"])
+        keys = [text_hash(text) for text in texts] if cache is not None else None
+        to_process = []
+        for i in range(len(texts)):
+            stats = cache.get(keys[i]) if cache is not None else None
+            if stats is None:
+                to_process.append(i)
+            else:
+                lang_results[i] = stats
 
-            if (i + 1) % 10 == 0 or i == len(texts) - 1:
-                print(f"  → {i + 1}/{len(texts)} textes traités")
+        pairs = ((texts[i], i) for i in to_process)
+        docs_stats = iter_doc_stats(get_nlp(), pairs, batch_size, n_process, max_chunk_chars)
+        for n_done, (stats, n_spacy_tokens, i) in enumerate(docs_stats, 1):
+            lang_results[i] = stats
+            total_tokens += n_spacy_tokens
+            if cache is not None:
+                cache.put(keys[i], stats)
 
+            if n_done % 10 == 0 or n_done == len(to_process):
+                print(f"  → {n_done}/{len(to_process)} textes traités")
+
+        total_lemmes = sum(len(stats["lemmes"]) for stats in lang_results)
         print(f"[INFO] Langue {lang} : {total_lemmes} lemmes extraits au total.")
+        print_throughput(lang, len(to_process), total_tokens, time.perf_counter() - start,
+                         batch_size, n_process)
         result[lang] = lang_results
 
     return result
 
+def token_stats(doc, with_pos=False):
+    """
+    Statistiques rapides d'un document : n_tokens et n_types ne dépendent que
+    du tokenizer ; prop_lemmes / prop_propn (POS) seulement si with_pos.
+    """
+    columns = doc_columns(doc, ["is_punct", "is_space", "is_quote", "is_currency", "lower", "pos"])
+    valid = valid_token_mask(columns)
+    n_tokens = int(valid.sum())
+    n_types = len(np.unique(columns["lower"][valid]))
+    n_propn = int((valid & is_propn(columns["pos"])).sum())
+
+    stats = {"n_tokens": n_tokens, "n_types": n_types}
+    if with_pos:
+        stats["prop_lemmes"] = round((n_tokens - n_propn) / n_tokens, 3) if n_tokens else 0.0
+        stats["prop_propn"] = round(n_propn / n_tokens, 3) if n_tokens else 0.0
+    return stats
+
+def iter_fast_stats(pairs, with_pos=False, batch_size=256):
+    """
+    Génère (stats, contexte) pour des couples (texte, contexte) sans le pipeline complet :
+    tokenizer seul (nlp.make_doc), ou tagger sans NER si with_pos.
+    """
+    if with_pos:
+        docs = get_nlp("lemma_pos").pipe(pairs, as_tuples=True, batch_size=batch_size)
+    else:
+        nlp = get_nlp("tokens")
+        docs = ((nlp.make_doc(text), context) for text, context in pairs)
+
+    for doc, context in docs:
+        yield token_stats(doc, with_pos), context
+
+def compute_stats_by_lang(corpus_by_lang, with_pos=False, batch_size=256):
+    """
+    Mode statistiques rapide : {langue: [{n_tokens, n_types (, prop_lemmes, prop_propn)}]}
+    directement exploitable par visualize_stats.
+    """
+    result = {}
+
+    for lang, texts in corpus_by_lang.items():
+        start = time.perf_counter()
+        pairs = ((text, None) for text in texts)
+        result[lang] = [stats for stats, _ in iter_fast_stats(pairs, with_pos, batch_size)]
+        elapsed = time.perf_counter() - start
+        print(f"[INFO] Statistiques {lang} : {len(texts)} textes en {elapsed:.1f} s")
+
+    return result
+
+def iter_fast_stats_records(records, with_pos=False, batch_size=256):
+    """
+    Version en flux de compute_stats_by_lang pour des enregistrements {lang, path, text}.
+    """
+    pairs = ((record["text"], record) for record in records)
+    for stats, record in iter_fast_stats(pairs, with_pos, batch_size):
+        yield {"lang": record["lang"], "path": record.get("path"), **stats}
+
 def save_processed_data(result, output_path):
     """
     Sauvegarde le dictionnaire de résultats JSON.
@@ -97,3 +282,53 @@ def save_processed_data(result, output_path):
     with open(output_path, "w", encoding="utf-8") as f:
         json.dump(result, f, ensure_ascii=False, indent=2)
     print(f"\n[OK] Résultats sauvegardés dans : {output_path}")
+
+def iter_processed_records(records, batch_size=32, n_process=1, cache=None, max_chunk_chars=None):
+    """
+    Version en flux de process_texts_by_lang : prend des enregistrements
+    {lang, path, text} (ex : iter_jsonl) et génère {lang, path, lemmes, ...}
+    document par document, dans l'ordre d'entrée.
+    cache : AnnotationCache optionnel, seuls les textes inconnus sont annotés.
+    max_chunk_chars : découpe les textes longs (voir iter_doc_stats).
+    """
+    def pairs():
+        for record in records:
+            key = text_hash(record["text"]) if cache is not None else None
+            stats = cache.get(key) if cache is not None else None
+            # Texte déjà en cache : un texte vide suffit à garder sa place dans le flux
+            yield ("" if stats is not None else record["text"]), (record, key, stats)
+
+    docs_stats = iter_doc_stats(get_nlp(), pairs(), batch_size, n_process, max_chunk_chars)
+
+    # Par langue : [textes annotés, tokens, secondes] ; le temps écoulé depuis le
+    # résultat précédent est attribué à la langue du document qui arrive
+    by_lang = {}
+    start = last = time.perf_counter()
+    for i, (new_stats, n_spacy_tokens, (record, key, stats)) in enumerate(docs_stats, 1):
+        now = time.perf_counter()
+        counters = by_lang.setdefault(record["lang"], [0, 0, 0.0])
+        counters[2] += now - last
+        last = now
+
+        if stats is None:
+            counters[0] += 1
+            counters[1] += n_spacy_tokens
+            stats = new_stats
+            if cache is not None:
+                cache.put(key, stats)
+        yield {"lang": record["lang"], "path": record.get("path"), **stats}
+
+        if i % 100 == 0:
+            print(f"  → {i} textes traités")
+
+    for lang, (n_docs, n_tokens, elapsed) in by_lang.items():
+        print_throughput(lang, n_docs, n_tokens, elapsed, batch_size, n_process)
+    print_throughput("total", sum(c[0] for c in by_lang.values()), sum(c[1] for c in by_lang.values()),
+                     time.perf_counter() - start, batch_size, n_process)
+
+def save_processed_jsonl(records, output_path):
+    """
+    Écrit les résultats au format JSONL au fil du traitement.
+    """
+    n_docs = write_jsonl(records, output_path)
+    print(f"\n[OK] Résultats sauvegardés dans : {output_path} ({n_docs} documents)")
@@ -1,14 +1,15 @@
 import json
 import matplotlib.pyplot as plt
-from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.feature_extraction.text import TfidfVectorizer, TfidfTransformer
 from sklearn.decomposition import TruncatedSVD
 import numpy as np
+from hashing_features import hash_tokens
 
 def load_clusters(json_path):
     with open(json_path, "r", encoding="utf-8") as f:
         return json.load(f)
 
-def plot_clusters_for_lang(lang, clusters_dict, title):
+def plot_clusters_for_lang(lang, clusters_dict, title, n_features=None):
     labels = []
     tokens = []
 
@@ -21,9 +22,12 @@ def plot_clusters_for_lang(lang, clusters_dict, title):
         print(f"[WARN] Trop peu de clusters pour {lang}, skipping.")
         return
 
-    # Vectorisation TF-IDF + Réduction de dimension
-    vectorizer = TfidfVectorizer(analyzer='char', ngram_range=(2, 3))
-    X = vectorizer.fit_transform(tokens)
+    # Vectorisation TF-IDF (n-grammes hachés si n_features est donné) + Réduction de dimension
+    if n_features is not None:
+        X = TfidfTransformer().fit_transform(hash_tokens(tokens, (2, 3), n_features))
+    else:
+        vectorizer = TfidfVectorizer(analyzer='char', ngram_range=(2, 3))
+        X = vectorizer.fit_transform(tokens)
 
     svd = TruncatedSVD(n_components=2, random_state=42)
     X_reduced = svd.fit_transform(X)
@@ -38,11 +42,11 @@ def plot_clusters_for_lang(lang, clusters_dict, title):
     plt.tight_layout()
     plt.show()
 
-def visualize_all_clusters(json_path, title_prefix):
+def visualize_all_clusters(json_path, title_prefix, n_features=None):
     all_clusters = load_clusters(json_path)
 
     for lang, clusters_dict in all_clusters.items():
-        plot_clusters_for_lang(lang, clusters_dict, title=f"{title_prefix} ({lang})")
+        plot_clusters_for_lang(lang, clusters_dict, title=f"{title_prefix} ({lang})", n_features=n_features)
 
 # Exemple d'exécution
 if __name__ == "__main__":
@@ -1,8 +1,22 @@
 import os
 import json
 import matplotlib.pyplot as plt
+from jsonl_io import is_jsonl, iter_jsonl
+
+STAT_KEYS = ["n_tokens", "n_types", "prop_lemmes", "prop_propn"]
 
 def load_processed_data(json_path):
+    """
+    Charge les résultats de traitement {langue: [docs]}.
+    Pour un fichier .jsonl, seules les statistiques sont gardées (pas les lemmes).
+    """
+    if is_jsonl(json_path):
+        data = {}
+        for record in iter_jsonl(json_path):
+            stats = {key: record[key] for key in STAT_KEYS if key in record}
+            data.setdefault(record["lang"], []).append(stats)
+        return data
+
     with open(json_path, "r", encoding="utf-8") as f:
         return json.load(f)
 
@@ -17,6 +31,10 @@ def plot_stat_per_lang(data, stat_key, ylabel, title):
         langs.append(lang)
         values.append(values_lang)
 
+    if not values:
+        print(f"[WARN] Statistique absente des données : {stat_key}")
+        return
+
     # Plot : Boxplot pour chaque langue
     plt.figure(figsize=(10, 6))
     plt.boxplot(values, labels=langs)
@@ -27,8 +45,7 @@ def plot_stat_per_lang(data, stat_key, ylabel, title):
     plt.tight_layout()
     plt.show()
 
-def main():
-    data_path = "../pipeline_results/processed_multilang.json"
+def main(data_path="../pipeline_results/processed_multilang.json"):
     data = load_processed_data(data_path)
 
     plot_stat_per_lang(data, "n_tokens", "Nombre de tokens", "Distribution du nombre de tokens par texte")
@@ -6,6 +6,8 @@ from sklearn.metrics import pairwise_distances
 from sklearn.feature_extraction.text import CountVectorizer
 from sklearn.manifold import MDS
 import matplotlib.cm as cm
+from jsonl_io import is_jsonl, iter_jsonl
+from hashing_features import hash_tokens
 
 def build_labels_from_clusters(tokens, clusters):
     token_to_cid = {}
@@ -87,25 +89,41 @@ def plot_mds_2d(ax, tokens, sim_mat, clusters, title):
     ax.set_title(title, fontsize=10)
     ax.grid(True)
 
-def load_data_for_lang(lang, processed_path, clusters_path):
+def iter_lang_docs(lang, processed_path):
+    """
+    Génère les documents traités d'une langue (lecture en flux pour un .jsonl).
+    """
+    if is_jsonl(processed_path):
+        yield from iter_jsonl(processed_path, lang=lang)
+        return
+
     with open(processed_path, "r", encoding="utf-8") as f:
         processed = json.load(f)
+    yield from processed.get(lang, [])
+
+def load_data_for_lang(lang, processed_path, clusters_path):
     with open(clusters_path, "r", encoding="utf-8") as f:
         clusters = json.load(f)
 
-    if lang not in processed or lang not in clusters:
+    if lang not in clusters:
         raise ValueError(f"Données manquantes pour la langue : {lang}")
 
-    all_lemmes = []
-    for doc in processed[lang]:
-        all_lemmes.extend(doc["lemmes"])
+    cluster_tokens = set(tok for c in clusters[lang].values() for tok in c["members"])
+
+    tokens = []
+    n_docs = 0
+    for doc in iter_lang_docs(lang, processed_path):
+        n_docs += 1
+        tokens.extend(t for t in doc["lemmes"] if t in cluster_tokens)
 
-    cluster_tokens = sorted(set(tok for c in clusters[lang].values() for tok in c["members"]))
-    tokens = [t for t in all_lemmes if t in cluster_tokens]
+    if n_docs == 0:
+        raise ValueError(f"Données manquantes pour la langue : {lang}")
 
     return tokens, clusters[lang]
 
-def vectorize(tokens, ngram_range=(2, 3)):
+def vectorize(tokens, ngram_range=(2, 3), n_features=None, alternate_sign=False):
+    if n_features is not None:
+        return hash_tokens(tokens, ngram_range, n_features, alternate_sign)
     vect = CountVectorizer(analyzer='char', ngram_range=ngram_range)
     X = vect.fit_transform(tokens)
     return X
@@ -113,7 +131,7 @@ def vectorize(tokens, ngram_range=(2, 3)):
 def build_similarity(X):
     return 1.0 - pairwise_distances(X, metric="cosine")
 
-def visualize_clusters(lang, processed_path, clusters_path, ngram_range=(2, 3)):
+def visualize_clusters(lang, processed_path, clusters_path, ngram_range=(2, 3), n_features=None):
     print(f"[INFO] Visualisation MDS pour la langue : {lang}")
 
     tokens, clusters = load_data_for_lang(lang, processed_path, clusters_path)
@@ -121,7 +139,7 @@ def visualize_clusters(lang, processed_path, clusters_path, ngram_range=(2, 3)):
         print(f"[WARN] Trop peu de données pour {lang}")
         return
 
-    X = vectorize(tokens, ngram_range)
+    X = vectorize(tokens, ngram_range, n_features)
     sim_matrix = build_similarity(X)
 
     fig, ax = plt.subplots(figsize=(8, 6))
@@ -1,5 +1,5 @@
-import glob
 import os
+import sys
 import json
 import numpy as np
 from collections import defaultdict
@@ -8,22 +8,22 @@ from sklearn.metrics.pairwise import cosine_similarity
 from sklearn.metrics import confusion_matrix, classification_report
 import seaborn as sns
 import matplotlib.pyplot as plt
+# corpus_manifest est partagé : une seule copie, dans prog/prog
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "prog"))
+from corpus_manifest import CorpusManifest
 
-TRAIN_PATH = "../../données/corpus_multi/*/appr/*"
-TEST_PATH = "../../données/corpus_multi/*/test/*"
+CORPUS_DIR = "../../données/corpus_multi"
 OUTPUT_PREDICTIONS = "../../resultats/exo1/predictions.json"
 NGRAM_RANGE = (3, 3)
 MAX_FEATURES = 5000
 TOP_K = 3
 
-def open_entrainementDataBase(base_path):
-    files = glob.glob(base_path)
+def open_entrainementDataBase(manifest, split="appr"):
     data_by_lang = defaultdict(list)
-    for file_path in files:
-        parts = file_path.split(os.sep)
-        lang = parts[-3]
+    for entry in manifest.query(split=split):
+        file_path = os.path.join(manifest.base_dir, entry["path"])
         with open(file_path, "r", encoding="utf-8") as f:
-            data_by_lang[lang].append(f.read())
+            data_by_lang[entry["lang"]].append(f.read())
     return data_by_lang
 
 def ConstructionCalculs(data_by_lang, ngram_range=(3, 3), max_features=None):
@@ -58,12 +58,11 @@ def PredictLangues(text, vectorizer, centroids, top_k=3):
     confidence = best_sim / total_sim if total_sim > 0 else 0.0
     return predicted_lang, confidence, sorted_langs[:top_k]
 
-def PyProgWork(centroids, vectorizer, test_path, top_k=3):
-    test_files = glob.glob(test_path)
+def PyProgWork(centroids, vectorizer, manifest, top_k=3, split="test"):
     predictions = {}
-    for file_path in test_files:
-        parts = file_path.split(os.sep)
-        true_lang = parts[-3]
+    for entry in manifest.query(split=split):
+        file_path = os.path.join(manifest.base_dir, entry["path"])
+        true_lang = entry["lang"]
         with open(file_path, "r", encoding="utf-8") as f:
             text = f.read()
         pred_lang, confidence, top_langs = PredictLangues(text, vectorizer, centroids, top_k=top_k)
@@ -104,9 +103,10 @@ def PlotLangDist(centroids, all_langs):
     plt.show()
 
 def main():
-    data_by_lang = open_entrainementDataBase(TRAIN_PATH)
+    manifest = CorpusManifest.build(CORPUS_DIR, extensions=None)
+    data_by_lang = open_entrainementDataBase(manifest, split="appr")
     vectorizer, centroids = ConstructionCalculs(data_by_lang, ngram_range=NGRAM_RANGE, max_features=MAX_FEATURES)
-    predictions = PyProgWork(centroids, vectorizer, TEST_PATH, top_k=TOP_K)
+    predictions = PyProgWork(centroids, vectorizer, manifest, top_k=TOP_K, split="test")
     with open(OUTPUT_PREDICTIONS, "w", encoding="utf-8") as f:
         json.dump(predictions, f, indent=2, ensure_ascii=False)
     cm, langs, report, accuracy = CalculPrediction(predictions)
@@ -1,12 +1,12 @@
 import glob
-import spacy
 import json
 import matplotlib.pyplot as plt
 import numpy as np
 import os
+from spacy_profiles import load_with_profile
 
-### Modèle spaCy français
-nlp = spacy.load("fr_core_news_sm")
+### Modèle spaCy français (lemmes + POS : parser et NER inutiles ici)
+nlp = load_with_profile("fr_core_news_sm", "lemma_pos")
 
 AUTEURS = ["DAUDET", "MAUPASSANT"]
 OUTPUT_DIR = "../../resultats"
@@ -0,0 +1,39 @@
+import time
+from reader import load_corpus_by_language
+from spacy_processor import get_nlp, extract_doc_annotations, annotate_texts
+
+DATA_DIR = "../../corpus_multi"
+LANG = "da"
+LIMIT = 200
+
+def two_pass(nlp, texts):
+    """
+    Ancien fonctionnement : nlp(text) par texte, puis un second nlp.pipe
+    complet uniquement pour afficher la progression.
+    """
+    processed_docs = [extract_doc_annotations(nlp(text)) for text in texts]
+    for _ in nlp.pipe(texts, batch_size=32):
+        pass
+    return processed_docs
+
+def single_pass(nlp, texts):
+    return annotate_texts(nlp, texts)
+
+def main():
+    corpus = load_corpus_by_language(DATA_DIR)
+    texts = corpus[LANG][:LIMIT]
+    nlp = get_nlp(LANG)
+    nlp(texts[0])  # préchauffage
+
+    timings = {}
+    for name, fn in [("avant (2 passages)", two_pass), ("après (1 passage)", single_pass)]:
+        start = time.perf_counter()
+        results = fn(nlp, texts)
+        timings[name] = time.perf_counter() - start
+        print(f"  {name:<20} → {timings[name]:.2f} s pour {len(results)} textes ({LANG})")
+
+    before, after = timings.values()
+    print(f"[BENCH] Accélération : x{before / after:.2f}")
+
+if __name__ == "__main__":
+    main()
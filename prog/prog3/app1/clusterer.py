@@ -1,6 +1,8 @@
 import numpy as np
+from scipy import sparse
 from sklearn.cluster import AffinityPropagation
 import time
+from sparse_similarity import sparse_affinity_propagation
 
 def run_affinity_propagation(similarity_matrix, random_state=42):
     """
@@ -10,7 +12,14 @@ def run_affinity_propagation(similarity_matrix, random_state=42):
     print("[CLUSTER] → Initialisation de l'algorithme AffinityPropagation")
 
     n_points = similarity_matrix.shape[0]
-    preference_val = np.median(similarity_matrix[np.nonzero(similarity_matrix)])
+    is_sparse = sparse.issparse(similarity_matrix)
+    if is_sparse:
+        # Graphe des plus proches voisins : les valeurs stockées sont les similarités non nulles
+        # des voisins les plus proches, d'où une médiane (préférence) plus haute que celle
+        # de la matrice complète et davantage de clusters qu'en mode dense
+        preference_val = np.median(similarity_matrix.data)
+    else:
+        preference_val = np.median(similarity_matrix[np.nonzero(similarity_matrix)])
     damping_val = 0.65
 
     print(f"[CLUSTER] → Nombre de points à clusteriser : {n_points}")
@@ -27,15 +36,23 @@ def run_affinity_propagation(similarity_matrix, random_state=42):
     )
 
     start = time.time()
-    ap.fit(similarity_matrix)
+    if is_sparse:
+        print(f"[CLUSTER] → Matrice creuse : {similarity_matrix.nnz} arêtes")
+        labels, centers_idx = sparse_affinity_propagation(
+            similarity_matrix, preference=preference_val, damping=damping_val,
+            max_iter=1000, convergence_iter=15, random_state=random_state
+        )
+    else:
+        ap.fit(similarity_matrix)
+        labels, centers_idx = ap.labels_, ap.cluster_centers_indices_
     end = time.time()
 
-    n_clusters = len(np.unique(ap.labels_))
+    n_clusters = len(np.unique(labels))
 
     print(f"[CLUSTER] ✅ Clustering terminé en {end - start:.2f} sec")
     print(f"[CLUSTER] → Nombre de clusters trouvés : {n_clusters}")
 
-    return ap.labels_, ap.cluster_centers_indices_
+    return labels, centers_idx
 
 
 def build_clusters_dict(labels, centers_idx, tokens):
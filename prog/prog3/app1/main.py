@@ -6,7 +6,7 @@ from tqdm import tqdm
 from reader import load_corpus_by_language
 
 # 🔍 spaCy NER + lemmatisation
-from spacy_processor import process_texts_by_lang
+from spacy_processor import process_texts_by_lang, model_pool
 
 # 📊 Vectorisation et clustering
 from vectorizer import vectorize_tokens, compute_similarity
@@ -24,11 +24,13 @@ NER_PREFIXES = ["B-LOC", "I-LOC"]
 USE_POS = True
 NGRAM_RANGE = (2, 3)
 MIN_TOKENS = 5
+SIMILARITY_TOP_K = None  # ex : 30 = graphe creux des plus proches voisins au lieu de la matrice N x N
+HTML_BACKEND = "html.parser"  # "lxml" ou "stream" : extraction plus rapide, texte pouvant différer
 
 
 def main():
     print("--- Étape 1 : Lecture du corpus HTML multilingue ---")
-    corpus = load_corpus_by_language(DATA_DIR)
+    corpus = load_corpus_by_language(DATA_DIR, backend=HTML_BACKEND)
     print(f"[OK] Langues détectées : {list(corpus.keys())}")
 
     print("\n--- Étape 2 : Traitement spaCy (NER + Lemmatisation) ---")
@@ -66,7 +68,7 @@ def main():
             continue
 
         X, vect = vectorize_tokens(all_tokens, analyzer="char", ngram_range=NGRAM_RANGE)
-        similarity_matrix = compute_similarity(X, metric="cosine")
+        similarity_matrix = compute_similarity(X, metric="cosine", top_k=SIMILARITY_TOP_K)
         labels, centers_idx = run_affinity_propagation(similarity_matrix)
         clusters_dict = build_clusters_dict(labels, centers_idx, all_tokens)
 
@@ -93,6 +95,9 @@ def main():
 
     print(f"\nLangues traitées : {done}/{total}  |  Ignorées : {skipped}")
 
+    print("\n--- Temps de chargement des modèles spaCy ---")
+    model_pool.print_stats()
+
 
 if __name__ == "__main__":
     main()
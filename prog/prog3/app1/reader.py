@@ -1,46 +1,42 @@
 import os
-import glob
-from bs4 import BeautifulSoup
+import sys
+from html_backends import DEFAULT_BACKEND, html_to_text, resolve_backend
+# corpus_manifest est partagé : une seule copie, dans prog/prog
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "prog"))
+from corpus_manifest import CorpusManifest
 
-def read_html_content(filepath):
+def read_html_content(filepath, backend=DEFAULT_BACKEND):
     """
-    Extrait et nettoie le texte d’un fichier HTML avec BeautifulSoup.
+    Extrait et nettoie le texte d’un fichier HTML (backend : voir html_backends).
     """
     try:
         with open(filepath, "r", encoding="utf-8") as f:
             html = f.read()
-        soup = BeautifulSoup(html, "html.parser")
-        return soup.get_text(separator=" ", strip=True)
+        return html_to_text(html, backend)
     except Exception as e:
         print(f"[WARN] Impossible de lire {filepath} : {e}")
         return ""
 
 
-def load_corpus_by_language(base_dir):
+def load_corpus_by_language(base_dir, backend=DEFAULT_BACKEND, manifest=None):
     """
     Parcourt tous les fichiers .html dans le corpus multilingue.
-    Regroupe les textes par langue (nom du dossier parent).
+    Regroupe les textes par langue (dossier de premier niveau).
+    manifest : CorpusManifest déjà construit (sinon un parcours unique de base_dir).
 
     Retourne : dict[str, list[str]]
     """
     corpus = {}
+    backend = resolve_backend(backend)
+    if manifest is None:
+        manifest = CorpusManifest.build(base_dir)
 
-    pattern = os.path.join(base_dir, "*", "**", "*.html")
-    filepaths = glob.glob(pattern, recursive=True)
-
-    for path in filepaths:
-        parts = os.path.normpath(path).split(os.sep)
-
-        # On cherche à capturer le dossier de langue (ex: fr, en, etc.)
-        if len(parts) < 3:
+    for lang in manifest.langs:
+        filepaths = manifest.paths(lang=lang)
+        if not filepaths:
             continue
 
-        lang = parts[-3]  # ex: ../../corpus_multi/fr/sousdir/fichier.html → "fr"
-        if lang not in corpus:
-            corpus[lang] = []
-
-        text = read_html_content(path)
-        if text:
-            corpus[lang].append(text)
+        texts = [read_html_content(path, backend) for path in filepaths]
+        corpus[lang] = [text for text in texts if text]
 
     return corpus
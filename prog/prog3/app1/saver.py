@@ -1,4 +1,5 @@
 import json
+from scipy import sparse
 
 def save_result_for_file(
     filepath,
@@ -11,10 +12,19 @@ def save_result_for_file(
     Sauvegarde dans un seul JSON :
       - le chemin du fichier source
       - la liste des tokens utilisés (used_tokens)
-      - la matrice de similarité (liste de listes)
+      - la matrice de similarité (liste de listes, ou format CSR si elle est creuse)
       - l'objet 'clusters' (dictionnaire)
     """
-    mat_list = similarity_matrix.tolist()
+    if sparse.issparse(similarity_matrix):
+        mat_list = {
+            "format": "csr",
+            "shape": list(similarity_matrix.shape),
+            "data": similarity_matrix.data.tolist(),
+            "indices": similarity_matrix.indices.tolist(),
+            "indptr": similarity_matrix.indptr.tolist(),
+        }
+    else:
+        mat_list = similarity_matrix.tolist()
     data_out = {
         "file": filepath,
         "tokens": used_tokens,    # nouvelle clé
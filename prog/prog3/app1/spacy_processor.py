@@ -1,4 +1,8 @@
-import spacy
+import time
+from spacy_profiles import load_with_profile
+from lemma_cache import LemmaCache, lemmatize_with_cache
+from model_pool import ModelPool
+from doc_arrays import doc_columns, hashes_to_strings, lemma_pos_strings, is_propn, IOB_STRINGS
 
 SPACY_MODELS = {
     #"fr": "fr_core_news_sm",
@@ -13,28 +17,40 @@ SPACY_MODELS = {
 }
 
 FALLBACK_MODEL = "xx_sent_ud_sm"
-loaded_models = {}
+# Nombre maximal de modèles gardés en mémoire (les *_trf sont lourds)
+MAX_MODELS = 2
+# Mémoire résidente au-delà de laquelle les modèles les moins récents sont libérés (None = pas de limite)
+MAX_RSS_MB = None
+lemma_cache = LemmaCache()
 
-def get_nlp(lang_code):
+
+def load_model(key):
     """
-    Charge le modèle spaCy adapté à la langue.
-    Si non supportée, utilise le modèle multilingue xx_sent_ud_sm.
+    Charge le modèle spaCy d'une clé (langue, profil) pour le pool.
     """
-    if lang_code in loaded_models:
-        return loaded_models[lang_code]
-
+    lang_code, profile = key
     model_name = SPACY_MODELS.get(lang_code, FALLBACK_MODEL)
 
     try:
-        nlp = spacy.load(model_name)
+        return load_with_profile(model_name, profile)
     except OSError:
         raise RuntimeError(
             f"[ERREUR] Le modèle spaCy '{model_name}' est manquant.\n"
             f"→ Exécute : python -m spacy download {model_name}"
         )
 
-    loaded_models[lang_code] = nlp
-    return nlp
+
+model_pool = ModelPool(load_model, max_models=MAX_MODELS, max_rss_mb=MAX_RSS_MB)
+
+
+def get_nlp(lang_code, profile="lemma_pos_ner"):
+    """
+    Charge le modèle spaCy adapté à la langue, limité aux composants du profil
+    (voir spacy_profiles : "tokens", "lemma_pos", "lemma_pos_ner", "full").
+    Si non supportée, utilise le modèle multilingue xx_sent_ud_sm.
+    Les modèles sont chargés à la demande et libérés selon le budget du pool.
+    """
+    return model_pool.get((lang_code, profile))
 
 
 def tokenize_by_space(text):
@@ -44,29 +60,101 @@ def tokenize_by_space(text):
     return text.strip().split()
 
 
-def lemmatize_tokens(tokens, use_pos=False, lang="xx"):
+def lemmatize_tokens(tokens, use_pos=False, lang="xx", cache=None):
     """
     Lemmatisation d'une liste de tokens avec spaCy.
+    Chaque type (langue, token) n'est lemmatisé qu'une fois : voir LemmaCache
+    (cache=None : cache mémoire partagé du module).
+    """
+    nlp = get_nlp(lang, profile="lemma_pos")
+    if cache is None:
+        cache = lemma_cache
+    return lemmatize_with_cache(nlp, tokens, cache, lang, use_pos)
+
+
+def extract_doc_annotations(doc, use_pos=True):
+    """
+    Extrait tokens, étiquettes NER (IOB) et lemmes d'un Doc spaCy,
+    en ignorant les noms propres et les stopwords.
+    Les attributs sont lus en colonnes (Doc.to_array) et filtrés avec NumPy ;
+    voir extract_doc_annotations_tokens pour la version token par token.
+    """
+    columns = doc_columns(doc, ["orth", "lemma", "pos", "ent_iob", "ent_type", "is_stop"])
+    kept = ~(is_propn(columns["pos"]) | columns["is_stop"])  # ni noms propres ni stopwords
+
+    tokens = hashes_to_strings(doc, columns["orth"][kept])
+    ent_types = hashes_to_strings(doc, columns["ent_type"][kept])
+    iobs = IOB_STRINGS[columns["ent_iob"][kept].astype(int)].tolist()
+    labels = [f"{iob}-{ent_type}" if ent_type else "O" for iob, ent_type in zip(iobs, ent_types)]
+
+    if use_pos:
+        lemmes = lemma_pos_strings(doc, columns["lemma"][kept], columns["pos"][kept])
+    else:
+        lemmes = [lemma.lower() for lemma in hashes_to_strings(doc, columns["lemma"][kept])]
+
+    return {
+        "tokens": tokens,
+        "labels": labels,
+        "lemmes": lemmes,
+    }
+
+
+def extract_doc_annotations_tokens(doc, use_pos=True):
+    """
+    Version token par token de extract_doc_annotations (référence pour les benchmarks).
     """
-    nlp = get_nlp(lang)
-    results = []
+    tokens = []
+    labels = []
+    lemmes = []
 
-    for doc in nlp.pipe(tokens):
-        if len(doc) == 0:
-            results.append("")
-            continue
+    for tok in doc:
+        if tok.pos_ == "PROPN" or tok.is_stop:
+            continue  # on ignore les noms propres et les stopwords
+
+        tokens.append(tok.text)
+        labels.append(f"{tok.ent_iob_}-{tok.ent_type_}" if tok.ent_type_ else "O")
 
-        token_spacy = doc[0]
-        lemma = token_spacy.lemma_.lower()
         if use_pos:
-            results.append(f"{lemma}_{token_spacy.pos_}")
+            lemmes.append(f"{tok.lemma_.lower()}_{tok.pos_}")
         else:
-            results.append(lemma)
+            lemmes.append(tok.lemma_.lower())
+
+    return {
+        "tokens": tokens,
+        "labels": labels,
+        "lemmes": lemmes,
+    }
+
+
+def print_progress(lang, done, total):
+    print(f"\r[spaCy] Traitement {done}/{total} pour '{lang}'", end="", flush=True)
+    if done == total:
+        print()
+
+
+def annotate_texts(nlp, texts, use_pos=True, batch_size=32, progress=None, progress_every=1.0):
+    """
+    Annote les textes en un seul passage nlp.pipe et extrait les annotations au fil de l'eau.
+    progress(done, total) est appelé au plus toutes les progress_every secondes
+    (et toujours pour le dernier texte).
+    """
+    processed_docs = []
+    total = len(texts)
+    last_report = time.perf_counter()
+
+    for i, doc in enumerate(nlp.pipe(texts, batch_size=batch_size), 1):
+        processed_docs.append(extract_doc_annotations(doc, use_pos))
+
+        if progress is not None:
+            now = time.perf_counter()
+            if i == total or now - last_report >= progress_every:
+                progress(i, total)
+                last_report = now
 
-    return results
+    return processed_docs
 
 
-def process_texts_by_lang(corpus_dict, use_pos=True):
+def process_texts_by_lang(corpus_dict, use_pos=True, batch_size=32):
     """
     Applique tokenisation, filtrage linguistique, NER et lemmatisation à un corpus multilingue.
     Retourne : {langue: [ {tokens, labels, lemmes} ]}
@@ -76,39 +164,13 @@ def process_texts_by_lang(corpus_dict, use_pos=True):
     for lang, texts in corpus_dict.items():
         print(f"[INFO] Traitement spaCy pour '{lang}'")
         nlp = get_nlp(lang)
-        processed_docs = []
-
-        for text in texts:
-            doc = nlp(text)
-
-            # Étape 1 : extraction de tous les tokens
-            tokens = []
-            labels = []
-            lemmes = []
-
-            for tok in doc:
-                if tok.pos_ == "PROPN" or tok.is_stop:
-                    continue  # on ignore les noms propres et les stopwords
-
-                tokens.append(tok.text)
-                labels.append(f"{tok.ent_iob_}-{tok.ent_type_}" if tok.ent_type_ else "O")
-
-                if use_pos:
-                    lemmes.append(f"{tok.lemma_.lower()}_{tok.pos_}")
-                else:
-                    lemmes.append(tok.lemma_.lower())
-
-            processed_docs.append({
-                "tokens": tokens,
-                "labels": labels,
-                "lemmes": lemmes,
-            })
-
-        results_by_lang[lang] = processed_docs
 
         print(f"[INFO] → {len(texts)} textes à traiter pour la langue '{lang}'")
-        for i, doc in enumerate(nlp.pipe(texts, batch_size=32), 1):
-            print(f"\r[spaCy] Traitement {i}/{len(texts)} pour '{lang}'", end="", flush=True)
-
+        results_by_lang[lang] = annotate_texts(
+            nlp, texts,
+            use_pos=use_pos,
+            batch_size=batch_size,
+            progress=lambda done, total: print_progress(lang, done, total)
+        )
 
     return results_by_lang
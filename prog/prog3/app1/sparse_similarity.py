@@ -0,0 +1,161 @@
+import numpy as np
+from scipy import sparse
+from sklearn.preprocessing import normalize
+
+# Graphe de similarité creux : pour chaque token, seuls ses top_k plus proches
+# voisins (cosinus sur les n-grammes) sont gardés. La mémoire croît en N*k
+# au lieu de N², les produits étant calculés par blocs de lignes.
+BLOCK_MB = 64  # taille visée d'un bloc dense de similarités (float32)
+
+def auto_block_size(n_rows, block_mb=BLOCK_MB):
+    return max(1, int(block_mb * 1024 * 1024 // (4 * max(n_rows, 1))))
+
+def knn_similarity(X, top_k=20, min_similarity=0.0, block_size=None, symmetric=True):
+    """
+    Matrice CSR (N x N, float32) des similarités cosinus de chaque ligne de X
+    avec ses top_k plus proches voisins (hors elle-même) de similarité > min_similarity.
+    symmetric : garde l'arête (i, j) dès que j est voisin de i ou i voisin de j.
+    """
+    X = normalize(sparse.csr_matrix(X, dtype=np.float32))
+    n = X.shape[0]
+    k = min(top_k, n - 1)
+    if block_size is None:
+        block_size = auto_block_size(n)
+
+    rows, cols, vals = [], [], []
+    XT = X.T.tocsc()
+
+    for start in range(0, n, block_size):
+        end = min(start + block_size, n)
+        block = (X[start:end] @ XT).toarray()
+        block[np.arange(end - start), np.arange(start, end)] = -np.inf  # pas de boucle
+
+        if k <= 0:
+            continue
+        top = np.argpartition(block, -k, axis=1)[:, -k:]
+        top_vals = np.take_along_axis(block, top, axis=1)
+        keep = top_vals > min_similarity
+
+        rows.append(np.nonzero(keep)[0] + start)
+        cols.append(top[keep])
+        vals.append(top_vals[keep])
+
+    if rows:
+        rows, cols, vals = np.concatenate(rows), np.concatenate(cols), np.concatenate(vals)
+    similarity = sparse.csr_matrix((vals, (rows, cols)), shape=(n, n), dtype=np.float32)
+
+    if symmetric:
+        similarity = similarity.maximum(similarity.T).tocsr()
+    similarity.sort_indices()
+    return similarity
+
+def row_argmax(values, starts):
+    """
+    Position (dans values) du maximum de chaque ligne d'une matrice CSR
+    dont aucune ligne n'est vide ; starts = indptr[:-1].
+    """
+    row_max = np.maximum.reduceat(values, starts)
+    rows = np.repeat(np.arange(len(starts)), np.diff(np.append(starts, len(values))))
+    hits = np.flatnonzero(values == row_max[rows])
+    _, first = np.unique(rows[hits], return_index=True)
+    return hits[first], row_max
+
+def sparse_affinity_propagation(similarity, preference=None, damping=0.7, max_iter=1000,
+                                convergence_iter=15, random_state=42):
+    """
+    AffinityPropagation limitée aux arêtes d'une matrice de similarité creuse :
+    les messages (responsabilités, disponibilités) ne circulent que sur les
+    arêtes stockées, plus la diagonale (préférence). Sur un graphe complet, mêmes
+    mises à jour, même bruit, même test de convergence et même affinage des
+    exemplaires que sklearn, donc mêmes labels à préférence égale.
+    preference=None : médiane des similarités stockées hors diagonale. Sur un
+    graphe des plus proches voisins, ce sont les plus fortes similarités : la
+    préférence est bien plus haute que la médiane de la matrice complète et donne
+    davantage de clusters ; passer preference pour retrouver le comportement dense.
+    Retourne (labels, cluster_centers_indices) comme AffinityPropagation.
+    """
+    coo = sparse.coo_matrix(similarity)
+    off_diag = coo.row != coo.col
+    n = coo.shape[0]
+    edge_vals = coo.data[off_diag].astype(np.float64)
+
+    if preference is None:
+        preference = np.median(edge_vals) if len(edge_vals) else 0.0
+
+    # Arêtes triées par ligne, avec exactement une arête diagonale par ligne
+    rows = np.concatenate([coo.row[off_diag], np.arange(n)])
+    cols = np.concatenate([coo.col[off_diag], np.arange(n)])
+    s = np.concatenate([edge_vals, np.full(n, preference, dtype=np.float64)])
+    order = np.lexsort((cols, rows))
+    rows, cols, s = rows[order], cols[order], s[order]
+    starts = np.searchsorted(rows, np.arange(n))
+    diag = rows == cols
+    diag_pos = np.flatnonzero(diag)
+
+    # Bruit minime pour départager les égalités (comme sklearn)
+    rng = np.random.RandomState(random_state)
+    s += (np.finfo(s.dtype).eps * s + np.finfo(s.dtype).tiny * 100) * rng.standard_normal(len(s))
+
+    r = np.zeros_like(s)
+    a = np.zeros_like(s)
+    history = np.zeros((n, convergence_iter), dtype=bool)
+
+    for it in range(max_iter):
+        # Responsabilités : r(i,k) = s(i,k) - max_{k' != k} (a(i,k') + s(i,k'))
+        total = a + s
+        first_pos, first = row_argmax(total, starts)
+        total[first_pos] = -np.inf
+        second = np.maximum.reduceat(total, starts)
+        second[np.isneginf(second)] = 0.0  # point isolé (seule la diagonale) : pas d'autre choix
+        best_other = first[rows]
+        best_other[first_pos] = second
+        r = damping * r + (1 - damping) * (s - best_other)
+
+        # Disponibilités : sommes par colonne des responsabilités positives
+        rp = np.where(diag, r, np.maximum(r, 0))
+        col_sums = np.bincount(cols, weights=rp, minlength=n)
+        new_a = col_sums[cols] - rp
+        new_a = np.where(diag, new_a, np.minimum(new_a, 0))
+        a = damping * a + (1 - damping) * new_a
+
+        # Convergence : exemplaires inchangés sur les convergence_iter dernières itérations
+        exemplars = (a[diag_pos] + r[diag_pos]) > 0
+        history[:, it % convergence_iter] = exemplars
+        if it >= convergence_iter:
+            seen = history.sum(axis=1)
+            if np.all((seen == convergence_iter) | (seen == 0)) and exemplars.any():
+                break
+
+    assigned = assign_to_exemplars(rows, cols, s, starts, exemplars)
+    assigned = assign_to_exemplars(rows, cols, s, starts, refine_exemplars(rows, cols, s, assigned))
+    centers = np.unique(assigned)
+    return np.searchsorted(centers, assigned), centers
+
+def assign_to_exemplars(rows, cols, s, starts, exemplars):
+    """
+    Exemplaire de chaque point : l'exemplaire voisin le plus similaire ; un point
+    sans exemplaire parmi ses voisins devient son propre exemplaire.
+    """
+    scores = np.where(exemplars[cols], s, -np.inf)
+    best_pos, best = row_argmax(scores, starts)
+
+    assigned = np.where(best > -np.inf, cols[best_pos], np.arange(len(starts)))
+    assigned[exemplars] = np.flatnonzero(exemplars)
+    return assigned
+
+def refine_exemplars(rows, cols, s, assigned):
+    """
+    Affinage de sklearn : dans chaque cluster, l'exemplaire devient le membre
+    dont la somme des similarités avec les membres (diagonale comprise) est
+    maximale, le plus petit indice en cas d'égalité. Une arête absente compte 0.
+    Retourne le masque des nouveaux exemplaires.
+    """
+    n = len(assigned)
+    same = assigned[rows] == assigned[cols]
+    within = np.bincount(cols[same], weights=s[same], minlength=n)
+
+    order = np.lexsort((np.arange(n), -within, assigned))
+    first = np.flatnonzero(np.r_[True, assigned[order][1:] != assigned[order][:-1]])
+    exemplars = np.zeros(n, dtype=bool)
+    exemplars[order[first]] = True
+    return exemplars
@@ -4,6 +4,7 @@
 import numpy as np
 from sklearn.feature_extraction.text import CountVectorizer
 from sklearn.metrics import pairwise_distances
+from sparse_similarity import knn_similarity
 
 def vectorize_tokens(tokens, analyzer='char', ngram_range=(2,3)):
     """
@@ -16,11 +17,17 @@ def vectorize_tokens(tokens, analyzer='char', ngram_range=(2,3)):
     X = vectorizer.fit_transform(tokens)
     return X, vectorizer
 
-def compute_similarity(X, metric='cosine'):
+def compute_similarity(X, metric='cosine', top_k=None, min_similarity=0.0, block_size=None):
     """
     Calcule la matrice de similarité à partir de la matrice X.
     (distance cosinus => similarité = 1 - distance)
+
+    top_k : si donné, matrice CSR des top_k plus proches voisins de chaque token
+    (cosinus > min_similarity), calculée par blocs de lignes (mémoire en N*k).
     """
+    if top_k is not None:
+        return knn_similarity(X, top_k, min_similarity, block_size)
+
     dist_matrix = pairwise_distances(X, metric=metric)
     similarity = 1.0 - dist_matrix
     return similarity
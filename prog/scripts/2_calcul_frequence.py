@@ -3,8 +3,8 @@
 
 import os
 import json
-import spacy
 from collections import Counter
+from spacy_profiles import load_with_profile
 
 # --- Chemins d'entrée / sortie ---
 INPUT_JSON = "../results/donnees_brutes.json"
@@ -12,7 +12,8 @@ OUTPUT_JSON = "../results/frequences.json"
 RESULTS_DIR = "../results"
 
 # Chargement d'un pipeline spaCy (fr_core_news_sm par exemple)
-nlp = spacy.load("fr_core_news_sm")
+# Seuls les tokens sont utilisés : profil "tokens" (tokenizer seul)
+nlp = load_with_profile("fr_core_news_sm", "tokens")
 
 def freq_dict(tokens):
     """
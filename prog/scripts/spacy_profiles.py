@@ -0,0 +1,37 @@
+import spacy
+
+# Profils d'annotation : composants spaCy à garder selon l'usage.
+# Les composants exclus ne sont ni chargés ni exécutés (spacy.load(exclude=...)).
+PROFILES = {
+    "tokens": set(),  # tokenizer seul (text, is_punct, is_stop...)
+    "lemma_pos": {"tok2vec", "transformer", "tagger", "morphologizer",
+                  "attribute_ruler", "lemmatizer", "trainable_lemmatizer"},
+    "lemma_pos_ner": {"tok2vec", "transformer", "tagger", "morphologizer",
+                      "attribute_ruler", "lemmatizer", "trainable_lemmatizer",
+                      "ner", "entity_ruler"},
+    "full": None,  # pipeline complet (parser compris)
+}
+DEFAULT_PROFILE = "full"
+
+# Composants standards des modèles spaCy ; les composants inconnus sont toujours gardés
+KNOWN_COMPONENTS = {"tok2vec", "transformer", "tagger", "morphologizer", "parser",
+                    "senter", "sentencizer", "attribute_ruler", "lemmatizer",
+                    "trainable_lemmatizer", "ner", "entity_ruler", "span_finder", "spancat"}
+
+def profile_exclude(profile):
+    """
+    Liste des composants à exclure pour un profil.
+    """
+    if profile not in PROFILES:
+        raise ValueError(f"Profil spaCy inconnu : {profile} (choix : {list(PROFILES)})")
+
+    keep = PROFILES[profile]
+    if keep is None:
+        return []
+    return sorted(KNOWN_COMPONENTS - keep)
+
+def load_with_profile(model_name, profile=DEFAULT_PROFILE):
+    """
+    Charge un modèle spaCy avec seulement les composants requis par le profil.
+    """
+    return spacy.load(model_name, exclude=profile_exclude(profile))